@@ -12,6 +12,7 @@ import os
 import uuid
 import pandas as pd  # Adicionando import do pandas
 import logger_app
+from data_ingestion import normalize_cpf
 from tkinter import filedialog
 
 FORM_FIELD_MAPPING = {
@@ -82,6 +83,10 @@ class DetailsManager:
             messagebox.showinfo("Aviso", "Este perfil não acessa detalhes.")
             return
 
+        # Textos longos (itens, endereço, dados bancários...) são lidos só ao abrir a solicitação
+        row_data = self.app.sheets_handler.load_row_details(row_data)
+        self.app.current_row_data = row_data
+
         # Oculta o frame da tabela principal, se existir
         if self.app.table_frame and self.app.table_frame.winfo_exists():
             self.app.table_frame.pack_forget()
@@ -400,10 +405,9 @@ class DetailsManager:
                     )
                     history_tree.column(col, anchor='center', width=120)
 
-                all_data = self.app.sheets_handler.load_data()
-                cpf = str(row_data.get('CPF:', '')).strip()
-                all_data['CPF:'] = all_data['CPF:'].astype(str).str.strip()
-                history_data = all_data[all_data['CPF:'] == cpf]
+                all_data = self.app.sheets_handler.load_typed_data()
+                cpf = normalize_cpf(row_data.get('CPF:', ''))
+                history_data = all_data[all_data['CPF_norm'] == cpf] if cpf else all_data.iloc[0:0]
                 # Armazena os dados históricos para uso no clique duplo
                 self.app.history_tree_data = history_data.copy()
 
@@ -571,6 +575,7 @@ class DetailsManager:
         window.geometry(f"{w}x{h}+{x}+{y}")
 
     def show_details_in_new_window(self, row_data):
+        row_data = self.app.sheets_handler.load_row_details(row_data)
         detail_window = tb.Toplevel(self.app.root)
         detail_window.title("Detalhes da Solicitação")
         w, h = 800, 600  # Tamanho fixo
@@ -766,9 +771,10 @@ class DetailsManager:
                     
                 if all_success and new_status:
                     ts_str = row_data['Carimbo de data/hora']
-                    if new_value:
-                        self.app.sheets_handler.update_value(ts_str, new_value, self.app.user_name)
-                    self.app.sheets_handler.update_status(ts_str, new_status, self.app.user_name)
+                    self.app.sheets_handler.transition(
+                        ts_str, new_status=new_status, new_value=new_value or None,
+                        user_name=self.app.user_name
+                    )
                     status_label.config(
                         text=f"Concluído! {success_count} emails enviados. Status atualizado."
                     )
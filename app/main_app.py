@@ -1,26 +1,41 @@
 import os
 import json
-import pandas as pd
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-from datetime import datetime, date
 from PIL import Image, ImageTk
 from tkinter import messagebox, BOTH, LEFT, Y, RIGHT, X, END
+import queue
 import sys
+import threading
 
 from constants import (
     ALL_COLUMNS_DETAIL, ALL_COLUMNS, BG_COLOR, BUTTON_BG_COLOR, FRAME_BG_COLOR,
     STATUS_COLORS, COLUMN_DISPLAY_NAMES
 )
-from google_sheets_handler import GoogleSheetsHandler
+from storage_backend import StorageBackend
+from data_ingestion import TYPED_SORT_COLUMNS, sort_rows
 from email_sender import EmailSender
+import logger_app
+import quota_governor
 
 from .details_manager import DetailsManager
-from .statistics_manager import StatisticsManager
-from .settings_manager import SettingsManager
+from .virtual_table import VirtualTable
+
+# Visões da barra lateral -> status filtrado
+VIEW_STATUS = {
+    "Aguardando aprovação": '',
+    "Aceitas": 'Solicitação Aceita',
+    "Aguardando documentos": 'Aguardando documentação',
+    "Pronto para pagamento": 'Pronto para pagamento',
+}
+
+# Carregamentos mais rápidos que isso não chegam a mostrar o indicador (evita piscar)
+LOADING_DELAY_MS = 150
+# Pausa na digitação antes de a busca ser aplicada
+SEARCH_DEBOUNCE_MS = 300
 
 class App:
-    def __init__(self, root, sheets_handler: GoogleSheetsHandler, email_sender: EmailSender, user_role, user_name):
+    def __init__(self, root, sheets_handler: StorageBackend, email_sender: EmailSender, user_role, user_name):
         self.root = root
         self.sheets_handler = sheets_handler
         self.email_sender = email_sender
@@ -40,6 +55,12 @@ class App:
         self.current_view = None
         self.treeview_data = None
         self.email_templates = {}
+        self._load_generation = 0  # número do carregamento mais recente da tabela (ver update_table)
+        self._search_after = None  # busca agendada pela digitação (ver _schedule_search)
+        self._loading_after = None  # indicador de carregamento agendado (ver update_table)
+        self._shown_search = ''    # termo da busca carregada por último na tabela
+        self.sorted_column = None  # ordenação escolhida na tabela principal (ver treeview_sort_column)
+        self.sort_reverse = False
 
         # Cores
         self.bg_color = BG_COLOR
@@ -53,8 +74,9 @@ class App:
 
         # Instancia managers
         self.details_manager = DetailsManager(self)
-        self.statistics_manager = StatisticsManager(self)
-        self.settings_manager = SettingsManager(self)
+        # Estatísticas (matplotlib/numpy) e configurações (cryptography) só são carregadas no primeiro uso
+        self._statistics_manager = None
+        self._settings_manager = None
 
         # Carrega templates de e-mail
         self.load_email_templates()
@@ -103,6 +125,70 @@ class App:
             ]
         }
 
+        # Chamadas vindas de threads de segundo plano, executadas na thread do Tk
+        self._ui_calls = queue.Queue()
+        self._process_ui_calls()
+        self.sheets_handler.add_data_listener(self._on_data_reloaded)
+        # Novas respostas do formulário chegam sem precisar recarregar a tela
+        self.sheets_handler.start_polling()
+
+    def call_in_ui(self, callback, *args):
+        """Agenda ``callback`` para rodar na thread do Tk; pode ser chamado de qualquer thread."""
+        self._ui_calls.put((callback, args))
+
+    def _process_ui_calls(self):
+        while True:
+            try:
+                callback, args = self._ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                logger_app.log_error(f"Erro ao atualizar a interface: {str(e)}")
+        self.root.after(100, self._process_ui_calls)
+
+    def _on_data_reloaded(self, data_version):
+        self.call_in_ui(self._apply_data_changes, self.sheets_handler.last_changes)
+
+    def _apply_data_changes(self, changes):
+        """Atualiza contadores, aviso de novas solicitações e a tela aberta após uma sincronização."""
+        self.update_sidebar_counts()
+        added = len(changes['added']) if changes else 0
+        if added:
+            self.new_requests_label.configure(text=f"{added} nova(s) solicitação(ões) recebida(s)")
+            self.root.after(15000, lambda: self.new_requests_label.configure(text=""))
+        self.refresh_current_view()
+
+    def update_sidebar_counts(self, counts=None):
+        """Mostra na barra lateral quantas solicitações há em cada status."""
+        if counts is None:
+            counts = self.sheets_handler.status_counts()
+        for view_name, button in self.view_buttons.items():
+            count = int(counts.get(VIEW_STATUS[view_name], 0))
+            button.configure(text=f"{self.view_button_texts[view_name]} ({count})")
+
+    def refresh_current_view(self):
+        """Redesenha a tabela visível e as estatísticas abertas com os dados mais recentes."""
+        if self.table_frame and self.table_frame.winfo_ismapped():
+            self.update_table()
+        if self._statistics_manager is not None:
+            self._statistics_manager.redraw_chart()
+
+    @property
+    def statistics_manager(self):
+        if self._statistics_manager is None:
+            from .statistics_manager import StatisticsManager
+            self._statistics_manager = StatisticsManager(self)
+        return self._statistics_manager
+
+    @property
+    def settings_manager(self):
+        if self._settings_manager is None:
+            from .settings_manager import SettingsManager
+            self._settings_manager = SettingsManager(self)
+        return self._settings_manager
+
     def load_email_templates(self):
         try:
             with open('email_templates.json', 'r', encoding='utf-8') as f:
@@ -179,6 +265,15 @@ class App:
         )
         self.ready_for_payment_button.pack(pady=10, padx=10, fill=X)
 
+        # Botões com contador de solicitações por status
+        self.view_buttons = {
+            "Aguardando aprovação": self.received_button,
+            "Aceitas": self.accepted_button,
+            "Aguardando documentos": self.await_docs_button,
+            "Pronto para pagamento": self.ready_for_payment_button,
+        }
+        self.view_button_texts = {name: btn.cget('text') for name, btn in self.view_buttons.items()}
+
         bottom_buttons_frame = tb.Frame(self.left_frame)
         bottom_buttons_frame.pack(side=BOTTOM, fill=X, pady=10)
 
@@ -210,6 +305,9 @@ class App:
 
         self.search_entry = tb.Entry(bottom_buttons_frame, textvariable=self.search_var, width=25)
         self.search_entry.pack(side=BOTTOM, pady=5, padx=10)
+        # Busca enquanto digita, aplicada após uma pausa; Enter aplica na hora
+        self.search_entry.bind("<KeyRelease>", self._schedule_search)
+        self.search_entry.bind("<Return>", lambda event: self._live_search())
 
         search_label = tb.Label(bottom_buttons_frame, text="Pesquisar:")
         search_label.pack(side=BOTTOM, pady=(10, 0), padx=10, anchor='w')
@@ -240,6 +338,24 @@ class App:
         )
         status_label.pack(side=LEFT, padx=10, pady=10)
 
+        self.pending_writes_label = tb.Label(
+            bottom_frame,
+            text="",
+            font=("Helvetica", 10),
+            bootstyle=WARNING
+        )
+        self.pending_writes_label.pack(side=RIGHT, padx=10, pady=10)
+
+        self.new_requests_label = tb.Label(
+            bottom_frame,
+            text="",
+            font=("Helvetica", 10),
+            bootstyle=INFO
+        )
+        self.new_requests_label.pack(side=RIGHT, padx=10, pady=10)
+        self.update_pending_writes_label()
+        self.root.protocol("WM_DELETE_WINDOW", self.logout)
+
         self.content_frame = tb.Frame(self.main_frame)
         self.content_frame.pack(side=LEFT, fill=BOTH, expand=True)
 
@@ -256,8 +372,26 @@ class App:
         )
 
     def logout(self):
+        # Garante que as alterações na fila cheguem à planilha antes de sair
+        if not self.sheets_handler.flush(timeout=30):
+            pending = self.sheets_handler.pending_writes
+            if not messagebox.askyesno(
+                "Alterações pendentes",
+                f"{pending} alteração(ões) ainda não foram gravadas na planilha. Sair mesmo assim?"
+            ):
+                return
         sys.exit(0)
 
+    def update_pending_writes_label(self):
+        pending = self.sheets_handler.pending_writes
+        messages = []
+        if self.sheets_handler.api_degraded:
+            messages.append("Sem conexão com a planilha: exibindo dados em cache")
+        if pending:
+            messages.append(f"Alterações pendentes de gravação: {pending}")
+        self.pending_writes_label.configure(text=" | ".join(messages))
+        self.root.after(500, self.update_pending_writes_label)
+
     def setup_welcome_screen(self):
         try:
             img_ig = Image.open('images/logo_unicamp.png')
@@ -302,6 +436,7 @@ class App:
     def select_view(self, view_name):
         self.current_view = view_name
         self.search_var.set('')
+        self.sorted_column = None  # uma nova visão começa na ordem padrão
 
         if self.welcome_frame.winfo_ismapped():
             self.welcome_frame.pack_forget()
@@ -312,11 +447,7 @@ class App:
             self.details_frame.pack_forget()
             self.details_frame.destroy()
             self.details_frame = None
-        if self.table_frame:
-            self.table_frame.pack_forget()
-            self.table_frame.destroy()
-            self.table_frame = None
-
+        # A tabela continua a mesma; update_table só aplica a nova visão
         self.update_table()
         self.update_selected_button(view_name)
 
@@ -331,13 +462,26 @@ class App:
             self.details_frame.pack_forget()
             self.details_frame.destroy()
             self.details_frame = None
-        if self.table_frame:
-            self.table_frame.pack_forget()
-            self.table_frame.destroy()
-            self.table_frame = None
-
+        # A tabela continua a mesma; update_table só aplica a nova visão
         self.update_table()
 
+    def _schedule_search(self, event=None):
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(SEARCH_DEBOUNCE_MS, self._live_search)
+
+    def _live_search(self):
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+            self._search_after = None
+        term = self.search_var.get().strip()
+        # Teclas que não mudam o texto (setas, Shift...) não refazem a busca
+        if self.current_view == "Search" and term == self._shown_search:
+            return
+        if self.current_view != "Search" and not term:
+            return
+        self.perform_search()
+
     def update_selected_button(self, view_name):
         for btn in [self.received_button, self.accepted_button, self.await_docs_button, self.ready_for_payment_button]:
             btn.configure(bootstyle=OUTLINE)
@@ -354,8 +498,6 @@ class App:
     def go_to_home(self):
         if self.table_frame:
             self.table_frame.pack_forget()
-            self.table_frame.destroy()
-            self.table_frame = None
         if self.details_frame:
             self.details_frame.pack_forget()
             self.details_frame.destroy()
@@ -380,14 +522,174 @@ class App:
 
         if self.table_frame:
             self.table_frame.pack_forget()
-            self.table_frame.destroy()
-            self.table_frame = None
 
         self.go_to_home()
 
     def update_table(self):
+        """Mostra a visão atual na tabela, que é criada uma vez e depois só recebe as diferenças.
+
+        Índices, dados tipados e busca são lidos numa thread de segundo plano;
+        a tabela só é tocada quando o resultado volta pela thread do Tk. Um
+        clique em outra visão antes disso descarta o carregamento anterior.
+        """
+        if self.table_frame is None:
+            self._build_table()
+        if not self.table_frame.winfo_ismapped():
+            self.table_frame.pack(fill=BOTH, expand=True, padx=20)
+
+        if self.current_view in self.custom_views:
+            self.columns_to_display = self.custom_views[self.current_view]
+        else:
+            self.columns_to_display = [
+                'Id', 'Carimbo de data/hora_str', 'Ultima Atualizacao_str', 'Ultima modificação',
+                'Nome completo (sem abreviações):', 'Telefone de contato:',
+                'Curso:', 'Orientador', 'Valor', 'Status'
+            ]
+
+        if self.tree.set_columns(self.columns_to_display):
+            self._table_version = None
+            self._table_data = None
+            self._configure_table_headings()
+
+        # Cada carregamento recebe um número; só o mais recente é aplicado
+        self._load_generation += 1
+        generation = self._load_generation
+        self._shown_search = self.search_var.get().strip()
+        # Carregamentos rápidos terminam antes do prazo e cancelam o indicador (ver _hide_loading)
+        if self._loading_after is not None:
+            self.root.after_cancel(self._loading_after)
+        self._loading_after = self.root.after(LOADING_DELAY_MS, lambda: self._show_loading(generation))
+        threading.Thread(
+            target=self._load_view,
+            args=(generation, VIEW_STATUS.get(self.current_view), self._shown_search,
+                  list(self.columns_to_display), self._table_version if self._table_data is not None else None),
+            daemon=True
+        ).start()
+
+    def _load_view(self, generation, status, search_term, columns, table_version):
+        """Lê tudo o que a visão precisa, fora da thread do Tk, e agenda ``_apply_view``."""
+        # A thread trabalha para a interface: as leituras da planilha não esperam atrás das de fundo
+        with quota_governor.priority(quota_governor.INTERACTIVE):
+            result = {}
+            try:
+                # Linhas da visão já na ordem padrão, mantidas pelo armazenamento
+                keys = self.sheets_handler.status_index(status)
+                result['counts'] = self.sheets_handler.status_counts()
+
+                # Os valores das linhas só são relidos quando a versão dos dados muda
+                version = self.sheets_handler.data_version
+                if table_version is None or version != table_version:
+                    data = self.sheets_handler.load_typed_data()
+                    final_columns = list(columns)
+                    for typed_col in TYPED_SORT_COLUMNS:
+                        if typed_col in data.columns and typed_col not in final_columns:
+                            final_columns.append(typed_col)
+                    table_data = data[final_columns]
+                    changes = None
+                    if table_version is not None:
+                        changes = self.sheets_handler.changes_since(table_version)
+                    if changes is not None:
+                        # Recargas incrementais não removem linhas; remoções chegam como recarga completa
+                        added, modified = changes
+                        rows_data = table_data.loc[table_data.index.intersection(added + modified)]
+                    else:
+                        rows_data = table_data
+                    result.update(data=data, table_data=table_data, version=version,
+                                  full=changes is None, rows=list(self._table_rows(rows_data, columns)))
+
+                # Busca pelo índice invertido do armazenamento (prefixos, vários termos e campo:termo)
+                default_order = True
+                suggestions = []
+                if search_term:
+                    matches = self.sheets_handler.search(search_term)
+                    if matches is not None:
+                        found = [key for key in keys if key in matches]
+                        if not found:
+                            # Nada exato: mostra as linhas dos nomes parecidos, do mais ao menos parecido
+                            similar = self.sheets_handler.similar_names(search_term)
+                            suggestions = list(dict.fromkeys(name for name, _, _, _ in similar))
+                            found = list(dict.fromkeys(key for _, _, _, name_keys in similar
+                                                       for key in keys if key in name_keys))
+                            default_order = False
+                        keys = found
+                result.update(keys=keys, suggestions=suggestions, default_order=default_order)
+            except KeyError as e:
+                result['error'] = f"Coluna não encontrada: {e}"
+            except Exception as e:
+                logger_app.log_error(f"Erro ao carregar a tabela: {str(e)}")
+                result['error'] = f"Erro ao carregar os dados: {e}"
+        self.call_in_ui(self._apply_view, generation, result)
+
+    def _apply_view(self, generation, result):
+        """Aplica na tabela o resultado de ``_load_view``, se ainda for o carregamento mais recente."""
+        if generation != self._load_generation or self.table_frame is None:
+            return
+        self._hide_loading()
+        if 'error' in result:
+            messagebox.showerror("Erro", result['error'])
+            return
+
+        self.update_sidebar_counts(result['counts'])
+        if 'table_data' in result:
+            self.data = result['data']
+            self._table_data = result['table_data']
+            if result['full']:
+                self.tree.set_rows(result['rows'])
+            elif result['rows']:
+                self.tree.update_rows(result['rows'])
+            self._table_version = result['version']
+
+        # Uma recarga entre as leituras pode trazer chaves que a tabela ainda não tem
+        keys = [key for key in result['keys'] if key in self._table_data.index]
+        self._show_suggestions(result['suggestions'])
+
+        # As atualizações da tabela (inclusive as do poller) mantêm a ordenação escolhida
+        sorted_column = self.sorted_column if self.sorted_column in self.columns_to_display else None
+        if result['default_order'] and sorted_column:
+            keys = list(sort_rows(self._table_data.loc[keys], sorted_column, ascending=not self.sort_reverse))
+
+        self.treeview_data = self._table_data.loc[keys]
+        self.tree.set_order(keys)
+
+        if result['default_order'] and sorted_column:
+            self._set_sort_heading(self.tree, sorted_column, self.sort_reverse)
+        elif result['default_order'] and 'Id' in self.columns_to_display:
+            # As linhas já vêm ordenadas por ID decrescente; só marca o cabeçalho
+            self._set_sort_heading(self.tree, 'Id', reverse=True)
+
+    def _show_loading(self, generation):
+        """Indicador de carregamento, só se o carregamento ``generation`` ainda estiver em andamento."""
+        self._loading_after = None
+        if generation != self._load_generation or self.loading_frame.winfo_ismapped():
+            return
+        self.loading_bar.start(15)
+        self.loading_frame.pack(fill=X, before=self.tree)
+
+    def _hide_loading(self):
+        if self._loading_after is not None:
+            self.root.after_cancel(self._loading_after)
+            self._loading_after = None
+        self.loading_bar.stop()
+        self.loading_frame.pack_forget()
+
+    def _show_suggestions(self, names):
+        """Mostra "Você quis dizer" acima da tabela; cada nome refaz a busca com ele."""
+        for widget in self.suggestions_frame.winfo_children():
+            widget.destroy()
+        if not names:
+            self.suggestions_frame.pack_forget()
+            return
+
+        tb.Label(self.suggestions_frame, text="Nenhum resultado exato. Você quis dizer:").pack(side=LEFT)
+        for name in names:
+            tb.Button(
+                self.suggestions_frame, text=name, bootstyle="link",
+                command=lambda _name=name: (self.search_var.set(_name), self.perform_search())
+            ).pack(side=LEFT)
+        self.suggestions_frame.pack(fill=X, before=self.tree)
+
+    def _build_table(self):
         self.table_frame = tb.Frame(self.content_frame)
-        self.table_frame.pack(fill=BOTH, expand=True, padx=20)
 
         table_title_label = tb.Label(
             self.table_frame,
@@ -396,31 +698,27 @@ class App:
         )
         table_title_label.pack(pady=10)
 
+        # Sugestões de nomes parecidos quando a busca não encontra nada (ver _show_suggestions)
+        self.suggestions_frame = tb.Frame(self.table_frame)
+
+        # Indicador de carregamento, mostrado enquanto a visão é lida em segundo plano
+        self.loading_frame = tb.Frame(self.table_frame)
+        tb.Label(self.loading_frame, text="Carregando...", font=("Helvetica", 10)).pack(side=LEFT, padx=(0, 10))
+        self.loading_bar = tb.Progressbar(self.loading_frame, mode='indeterminate', bootstyle='info-striped')
+        self.loading_bar.pack(side=LEFT, fill=X, expand=True)
+
         style = tb.Style()
         row_height = 40
         style.configure("Treeview", rowheight=row_height, font=("TkDefaultFont", 11))
 
-        self.tree = tb.Treeview(self.table_frame, show="headings", style="Treeview")
+        # Só as linhas visíveis viram itens do Treeview (ver virtual_table)
+        self.tree = VirtualTable(self.table_frame, [], status_colors=self.status_colors, row_height=row_height)
         self.tree.pack(fill=BOTH, expand=True)
+        self.tree.treeview.bind("<Double-1>", self.on_treeview_click)
+        self._table_version = None
+        self._table_data = None  # colunas exibidas + tipadas de todas as linhas, na versão _table_version
 
-        scrollbar = tb.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=RIGHT, fill=Y)
-
-        self.tree.bind("<Double-1>", self.on_treeview_click)
-        self.tree.tag_configure('oddrow', background='#f0f8ff')
-        self.tree.tag_configure('evenrow', background='#ffffff')
-
-        if self.current_view in self.custom_views:
-            self.columns_to_display = self.custom_views[self.current_view]
-        else:
-            self.columns_to_display = [
-                'Id', 'Carimbo de data/hora_str', 'Ultima Atualizacao_str', 'Ultima modificação',
-                'Nome completo (sem abreviações):', 'Telefone de contato:',
-                'Curso:', 'Orientador', 'Valor', 'Status'
-            ]
-
-        self.tree["columns"] = self.columns_to_display
+    def _configure_table_headings(self):
         max_widths = {
             'Telefone de contato:': 70,
             'Ultima modificação': 55,
@@ -458,124 +756,40 @@ class App:
             col_width = max(max_widths.get(col, 150), min_widths.get(col, 50))
             self.tree.column(col, anchor="center", width=col_width)
 
-        # Busca os dados atualizados da planilha
-        self.data = self.sheets_handler.load_data()
-
-        self.data['Carimbo de data/hora'] = pd.to_datetime(
-            self.data['Carimbo de data/hora'],
-            format='%d/%m/%Y %H:%M:%S',
-            errors='coerce'
-        )
-        self.data['Carimbo de data/hora_str'] = self.data['Carimbo de data/hora'].dt.strftime('%d/%m/%Y')
-
-        self.data['Ultima Atualizacao'] = pd.to_datetime(
-            self.data['Ultima Atualizacao'],
-            format='%d/%m/%Y %H:%M:%S',
-            errors='coerce'
-        )
-        self.data['Ultima Atualizacao_str'] = self.data['Ultima Atualizacao'].dt.strftime('%d/%m/%Y')
-
-        if self.current_view == "Search":
-            data_filtered = self.data.copy()
-        elif self.current_view == "Aguardando aprovação":
-            data_filtered = self.data[self.data['Status'] == '']
-        elif self.current_view == "Aceitas":
-            data_filtered = self.data[self.data['Status'] == 'Solicitação Aceita']
-        elif self.current_view == "Aguardando documentos":
-            data_filtered = self.data[self.data['Status'] == 'Aguardando documentação']
-        elif self.current_view == "Pronto para pagamento":
-            data_filtered = self.data[self.data['Status'] == 'Pronto para pagamento']
-        else:
-            data_filtered = self.data.copy()
-
-        search_term = self.search_var.get().lower()
-        if search_term:
-            cols_for_search = [c for c in self.columns_to_display if c in data_filtered.columns]
-            data_filtered = data_filtered[
-                data_filtered[cols_for_search].apply(
-                    lambda row: row.astype(str).str.lower().str.contains(search_term).any(),
-                    axis=1
-                )
-            ]
-
-        final_columns = list(self.columns_to_display)
-        if 'Carimbo de data/hora' not in final_columns:
-            final_columns.append('Carimbo de data/hora')
-
-        try:
-            data_filtered = data_filtered[final_columns]
-        except KeyError as e:
-            messagebox.showerror("Erro", f"Coluna não encontrada: {e}")
-            return
-
-        self.treeview_data = data_filtered.copy()
-
-        for idx, row in data_filtered.iterrows():
-            values = row[self.columns_to_display].tolist()
-            tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-            status_value = row.get('Status', '')
-            status_color = self.status_colors.get(status_value, '#000000')
-
-            self.tree.tag_configure(f'status_tag_{idx}', foreground=status_color)
-            self.tree.insert(
-                "", "end", iid=str(idx),
-                values=values, tags=(tag, f'status_tag_{idx}')
-            )
-
-        # Após configurar todas as colunas e inserir os dados, ordena por ID decrescente
-        if 'Id' in self.columns_to_display:
-            self.treeview_sort_column(self.tree, 'Id', reverse=True)
+    @staticmethod
+    def _table_rows(table_data, columns):
+        statuses = table_data['Status'] if 'Status' in table_data.columns else [''] * len(table_data)
+        display = table_data[columns]
+        return zip(display.index, display.itertuples(index=False, name=None), statuses)
 
     def treeview_sort_column(self, tv, col, reverse):
-        self.sorted_column = col
-        self.sort_reverse = reverse
-        data_list = [(tv.set(k, col), k) for k in tv.get_children('')]
-        
-        # Função auxiliar para converter datas
-        def convert_date(date_str):
-            try:
-                return datetime.strptime(date_str, '%d/%m/%Y')
-            except:
-                return datetime.min
-
-        # Função melhorada para converter IDs considerando formato XXXX-YYYY
-        def convert_id(id_str):
-            try:
-                # Remove espaços e verifica se está vazio
-                if not id_str or id_str.strip() == '':
-                    return -1
-                
-                # Separa o ID no hífen e pega a segunda parte
-                parts = id_str.strip().split('-')
-                if len(parts) == 2:
-                    return int(parts[1].strip())  # Converte apenas a parte YYYY
-                return -1  # Retorna -1 para formatos inválidos
-                
-            except (ValueError, TypeError, IndexError):
-                return -1  # Retorna -1 para qualquer erro
-
-        # Determinando o tipo de ordenação baseado na coluna
-        if col in ['Carimbo de data/hora_str', 'Ultima Atualizacao_str']:
-            data_list.sort(key=lambda x: convert_date(x[0]), reverse=reverse)
-        elif col == 'Id':
-            # Ordena por ID (considerando apenas parte após o hífen) e depois por data
-            data_list.sort(key=lambda x: (convert_id(x[0]), convert_date(tv.set(x[1], 'Carimbo de data/hora_str'))), reverse=reverse)
-        elif col == 'Valor':
-            data_list.sort(key=lambda x: float(x[0].replace('R$', '').replace('.', '').replace(',', '.').strip() or 0), reverse=reverse)
+        """Ordena a tabela principal ou o histórico pelas chaves tipadas (ver data_ingestion.sort_rows).
+
+        A ordenação parte da ordem exibida e é estável, então a ordenação
+        anterior desempata a nova.
+        """
+        if isinstance(tv, VirtualTable):
+            self.sorted_column = col
+            self.sort_reverse = reverse
+            # A tabela virtual ordena o conjunto completo, não só os itens visíveis
+            order = sort_rows(self.treeview_data.loc[tv.keys], col, ascending=not reverse)
+            tv.set_order(list(order))
         else:
-            data_list.sort(key=lambda x: str(x[0]).lower(), reverse=reverse)
+            shown = self.history_tree_data.loc[[int(k) for k in tv.get_children('')]]
+            for index, key in enumerate(sort_rows(shown, col, ascending=not reverse)):
+                tv.move(str(key), '', index)
 
-        # Reordenando os itens
-        for index, (val, k) in enumerate(data_list):
-            tv.move(k, '', index)
+        self._set_sort_heading(tv, col, reverse)
 
-        # Atualizando o cabeçalho com a seta
+    def _set_sort_heading(self, tv, col, reverse):
+        """Marca com seta a coluna ordenada e prepara o próximo clique para inverter a ordem."""
+        virtual = isinstance(tv, VirtualTable)
         arrow = "▲" if reverse else "▼"
         display_name = self.column_display_names.get(col, col)
         new_text = f"{display_name} {arrow}"
 
         # Removendo setas de todas as colunas
-        for column in tv["columns"]:
+        for column in (tv.columns if virtual else tv["columns"]):
             display_name = self.column_display_names.get(column, column)
             tv.heading(column, text=display_name)
 
@@ -593,7 +807,12 @@ class App:
         selected_item = self.tree.selection()
         if selected_item:
             row_index = int(selected_item[0])
-            self.current_row_data = self.sheets_handler.load_data().loc[row_index]
+            # Só a linha aberta (cache ou uma leitura pequena), com os textos longos já incluídos
+            row_data = self.sheets_handler.get_row(row_index)
+            if row_data is None:
+                messagebox.showerror("Erro", "Solicitação não encontrada. Atualize a tabela e tente novamente.")
+                return
+            self.current_row_data = row_data
             self.details_manager.show_details_in_place(self.current_row_data)
 
     def show_statistics(self):
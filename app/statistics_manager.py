@@ -18,6 +18,7 @@ except ImportError:
     HAS_MPLCURSORS = False
 
 from login import BASE_DIR
+from data_ingestion import CATEGORY_COLUMNS
 
 ASSETS_PATH = BASE_DIR / "images" / "assets" / "graphview"
 
@@ -125,6 +126,9 @@ class StatisticsManager:
         self.current_figure = None
         self.period_label = None
 
+        # Cache derivado (versão dos dados, DataFrame de solicitações pagas)
+        self._paid_cache = None
+
         self.fixed_motives_order = [
             "Outros",
             "Visita técnica",
@@ -476,15 +480,12 @@ class StatisticsManager:
         if not self.stats_window or not self.stats_window.winfo_exists():
             return
 
-        df = self.sheets_handler.load_data()
-        df['Ultima Atualizacao'] = pd.to_datetime(
-            df['Ultima Atualizacao'],
-            format='%d/%m/%Y %H:%M:%S',
-            errors='coerce'
-        )
-
-        df = df[df['Status'] == 'Pago'].copy()
+        df = self._get_paid_data()
         df = self._apply_period_filter(df)
+        # Categorias sem solicitações no período não entram nos gráficos (ex.: fatias de 0% na pizza)
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].cat.remove_unused_categories()
 
         if self.current_figure:
             plt.close(self.current_figure)
@@ -504,6 +505,18 @@ class StatisticsManager:
         else:
             self.draw_agencias(df)
 
+    def _get_paid_data(self):
+        """Retorna as solicitações pagas, recalculando apenas quando a versão dos dados muda."""
+        df = self.sheets_handler.load_typed_data()
+        version = self.sheets_handler.data_version
+        if self._paid_cache is None or self._paid_cache[0] != version:
+            paid = df[df['Status'] == 'Pago'].copy()
+            # Os gráficos trabalham com a data e o valor já tipados na ingestão
+            paid['Ultima Atualizacao'] = paid['Ultima Atualizacao_dt']
+            paid['Valor'] = paid['Valor_cents'] / 100
+            self._paid_cache = (version, paid)
+        return self._paid_cache[1].copy()
+
     def update_info_box(self, df):
         if df.empty:
             total_requests = 0
@@ -517,9 +530,9 @@ class StatisticsManager:
             pending_requests = 0
             awaiting_payment_requests = 0
             paid_requests = len(df)
-            df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce').fillna(0)
-            total_paid_values = df['Valor'].sum()
-            total_released_values = df['Valor'].sum()
+            # Soma exata em centavos; a conversão para reais só acontece na exibição
+            total_paid_values = int(df['Valor_cents'].sum()) / 100
+            total_released_values = int(df['Valor_cents'].sum()) / 100
 
         info_map = {
             "Total Solicitações": f"{total_requests}",
@@ -539,7 +552,6 @@ class StatisticsManager:
         ax.set_facecolor("#D9D9D9")
         ax.set_ylabel("Valor (R$)")
 
-        df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce').fillna(0)
 
         if df.empty:
             ax.text(0.5, 0.5, "Sem dados", ha='center', va='center')
@@ -550,7 +562,7 @@ class StatisticsManager:
                     ax.text(0.5, 0.5, "Sem 'SemanaMes'", ha='center', va='center')
                     ax.axis('off')
                 else:
-                    pivot = df.groupby(["SemanaMes", "Motivo da solicitação"])["Valor"].sum().unstack(fill_value=0)
+                    pivot = df.groupby(["SemanaMes", "Motivo da solicitação"], observed=True)["Valor"].sum().unstack(fill_value=0)
                     weeks_index = [1, 2, 3, 4, 5]
                     pivot = pivot.reindex(weeks_index, fill_value=0)
                     x = np.arange(len(weeks_index))
@@ -578,7 +590,7 @@ class StatisticsManager:
                     ax.text(0.5, 0.5, "Sem col MesAbrev", ha='center', va='center')
                     ax.axis('off')
                 else:
-                    pivot = df.groupby(["MesAbrev", "Motivo da solicitação"])["Valor"].sum().unstack(fill_value=0)
+                    pivot = df.groupby(["MesAbrev", "Motivo da solicitação"], observed=True)["Valor"].sum().unstack(fill_value=0)
                     if pivot.empty:
                         ax.text(0.5, 0.5, "Sem dados", ha='center', va='center')
                         ax.axis('off')
@@ -614,7 +626,7 @@ class StatisticsManager:
                     ax.text(0.5, 0.5, "Sem col MesAbrev", ha='center', va='center')
                     ax.axis('off')
                 else:
-                    pivot = df.groupby(["MesAbrev", "Motivo da solicitação"])["Valor"].sum().unstack(fill_value=0)
+                    pivot = df.groupby(["MesAbrev", "Motivo da solicitação"], observed=True)["Valor"].sum().unstack(fill_value=0)
                     if pivot.empty:
                         ax.text(0.5, 0.5, "Sem dados", ha='center', va='center')
                         ax.axis('off')
@@ -649,7 +661,7 @@ class StatisticsManager:
                     all_periods = df.attrs.get("all_periods", sorted(df["Periodo"].unique()))
                     period_labels = df.attrs.get("period_labels", all_periods)
                     
-                    pivot = df.groupby(["Periodo", "Motivo da solicitação"])["Valor"].sum().unstack(fill_value=0)
+                    pivot = df.groupby(["Periodo", "Motivo da solicitação"], observed=True)["Valor"].sum().unstack(fill_value=0)
                     pivot = pivot.reindex(all_periods, fill_value=0)
                     
                     if pivot.empty:
@@ -687,7 +699,7 @@ class StatisticsManager:
                     ax.text(0.5, 0.5, "Sem col YearSem", ha='center', va='center')
                     ax.axis('off')
                 else:
-                    pivot = df.groupby(["YearSem", "Motivo da solicitação"])["Valor"].sum().unstack(fill_value=0)
+                    pivot = df.groupby(["YearSem", "Motivo da solicitação"], observed=True)["Valor"].sum().unstack(fill_value=0)
                     if pivot.empty:
                         ax.text(0.5, 0.5, "Sem dados", ha='center', va='center')
                         ax.axis('off')
@@ -733,8 +745,7 @@ class StatisticsManager:
             ax_pie.text(0.5, 0.5, "Sem dados", ha='center', va='center')
             ax_pie.axis('off')
         else:
-            df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce').fillna(0)
-            group = df.groupby('Motivo da solicitação')['Valor'].sum()
+            group = df.groupby('Motivo da solicitação', observed=True)['Valor'].sum()
             group_fixed = group.reindex(self.fixed_motives_order, fill_value=0)
             total_sum = group_fixed.sum()
     
@@ -783,7 +794,6 @@ class StatisticsManager:
             ax.text(0.5, 0.5, "Sem dados (pagos)", ha='center', va='center')
             ax.axis('off')
         else:
-            df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce').fillna(0)
     
             if self.current_period == "mes":
                 if "SemanaMes" not in df.columns:
@@ -901,7 +911,6 @@ class StatisticsManager:
         self.current_figure.set_facecolor("#D9D9D9")
         ax.set_facecolor("#D9D9D9")
     
-        df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce').fillna(0)
         agencias = df['Qual a agência de fomento?'].value_counts()
         total_a = agencias.sum()
         if total_a <= 0:
@@ -0,0 +1,240 @@
+# virtual_table.py
+
+"""
+Tabela virtualizada para conjuntos grandes de solicitações.
+
+O ``ttk.Treeview`` mantém só um número fixo de itens ("slots"), o que cabe
+na área visível. Ao rolar, os mesmos slots recebem os valores das linhas da
+nova posição, então exibir 'Todos' não cria um item (nem uma tag) por linha
+do histórico. Rolagem, ordenação e seleção valem para o conjunto completo:
+a barra de rolagem é controlada pela tabela e ``selection()`` devolve a
+chave da linha (o índice no DataFrame), não o slot.
+"""
+
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+
+DEFAULT_STATUS_COLOR = '#000000'
+DEFAULT_HEADER_HEIGHT = 30  # px, até a primeira medição real do cabeçalho
+WHEEL_STEP = 3  # linhas por passo da roda do mouse
+
+
+class VirtualTable(tb.Frame):
+    def __init__(self, master, columns, status_colors=None, row_height=40, **kwargs):
+        super().__init__(master, **kwargs)
+        self.columns = list(columns)
+        self.row_height = row_height
+
+        self.treeview = tb.Treeview(self, show="headings", columns=self.columns, selectmode="browse")
+        self.scrollbar = tb.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+        self.treeview.pack(side=LEFT, fill=BOTH, expand=True)
+
+        self.treeview.tag_configure('oddrow', background='#f0f8ff')
+        self.treeview.tag_configure('evenrow', background='#ffffff')
+        # Uma tag fixa por status, em vez de uma por linha
+        self._status_tags = {}
+        for n, (status, color) in enumerate((status_colors or {}).items()):
+            self._status_tags[status] = f'status_{n}'
+            self.treeview.tag_configure(f'status_{n}', foreground=color)
+        self.treeview.tag_configure('status_default', foreground=DEFAULT_STATUS_COLOR)
+
+        self._keys = []        # chaves das linhas na ordem exibida
+        self._positions = {}   # chave -> posição em _keys
+        self._rows = {}        # chave -> (valores, status)
+        self._offset = 0       # posição da primeira linha visível
+        self._slots = []       # iids dos itens do Treeview
+        self._attached = set()
+        self._slot_keys = {}   # iid -> chave exibida no slot
+        self._selected_key = None
+        self._header_height = None
+
+        self.treeview.bind("<Configure>", self._on_resize)
+        self.treeview.bind("<<TreeviewSelect>>", self._on_select)
+        self.treeview.bind("<KeyPress>", self._on_key)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.treeview.bind(sequence, self._on_wheel)
+
+    # ------------------------------------------------------------------
+    # Dados
+    # ------------------------------------------------------------------
+    def set_rows(self, rows):
+        """Substitui todas as linhas. ``rows``: iterável de (chave, valores, status), já na ordem."""
+        self._rows = {key: (tuple(values), status) for key, values, status in rows}
+        self._set_keys(list(self._rows))
+
+    def update_rows(self, rows, removed=()):
+        """Aplica diferenças: insere ou atualiza as linhas de ``rows`` e remove as chaves de ``removed``."""
+        for key, values, status in rows:
+            self._rows[key] = (tuple(values), status)
+        removed = set(removed)
+        for key in removed:
+            self._rows.pop(key, None)
+        if removed:
+            self._set_keys([key for key in self._keys if key not in removed])
+        else:
+            self._render()
+
+    def set_columns(self, columns):
+        """Troca as colunas exibidas. Retorna False se já eram essas (nada a refazer)."""
+        columns = list(columns)
+        if columns == self.columns:
+            return False
+        self.columns = columns
+        self.treeview["columns"] = columns
+        # Os valores guardados seguiam as colunas antigas
+        self._rows = {}
+        self._set_keys([])
+        return True
+
+    def set_order(self, keys):
+        """Define quais linhas aparecem e em que ordem; as demais continuam guardadas, só não são exibidas."""
+        self._set_keys([key for key in keys if key in self._rows])
+
+    def _set_keys(self, keys):
+        self._keys = keys
+        self._positions = {key: position for position, key in enumerate(keys)}
+        if self._selected_key not in self._positions:
+            self._selected_key = None
+        self._render()
+
+    @property
+    def keys(self):
+        return list(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def selection(self):
+        """Chave da linha selecionada, como texto (mesmo formato dos iids do Treeview)."""
+        return () if self._selected_key is None else (str(self._selected_key),)
+
+    def select(self, key):
+        """Seleciona a linha ``key`` e rola até ela."""
+        position = self._positions.get(key)
+        if position is None:
+            return
+        self._selected_key = key
+        self.see(key)
+
+    def see(self, key):
+        position = self._positions.get(key)
+        if position is None:
+            return
+        if position < self._offset:
+            self._offset = position
+        elif position >= self._offset + len(self._slots):
+            self._offset = position - len(self._slots) + 1
+        self._render()
+
+    # ------------------------------------------------------------------
+    # Cabeçalhos (repassados ao Treeview)
+    # ------------------------------------------------------------------
+    def heading(self, column, **kwargs):
+        return self.treeview.heading(column, **kwargs)
+
+    def column(self, column, **kwargs):
+        return self.treeview.column(column, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Desenho
+    # ------------------------------------------------------------------
+    def _visible_rows(self):
+        if self._header_height is None and self._slots and self._slots[0] in self._attached:
+            bbox = self.treeview.bbox(self._slots[0])
+            if bbox:
+                self._header_height = bbox[1]
+        header = self._header_height or DEFAULT_HEADER_HEIGHT
+        return max(1, (self.treeview.winfo_height() - header) // self.row_height)
+
+    def _on_resize(self, event=None):
+        visible = self._visible_rows()
+        while len(self._slots) < visible:
+            slot = self.treeview.insert("", "end")
+            self._slots.append(slot)
+            self._attached.add(slot)
+        while len(self._slots) > visible:
+            slot = self._slots.pop()
+            self.treeview.delete(slot)
+            self._attached.discard(slot)
+            self._slot_keys.pop(slot, None)
+        self._render()
+
+    def _render(self):
+        visible = len(self._slots)
+        self._offset = max(0, min(self._offset, len(self._keys) - visible))
+        selected_slot = None
+
+        for i, slot in enumerate(self._slots):
+            position = self._offset + i
+            if position >= len(self._keys):
+                if slot in self._attached:
+                    self.treeview.detach(slot)
+                    self._attached.discard(slot)
+                self._slot_keys.pop(slot, None)
+                continue
+
+            key = self._keys[position]
+            values, status = self._rows[key]
+            parity = 'evenrow' if position % 2 == 0 else 'oddrow'
+            if slot not in self._attached:
+                self.treeview.move(slot, "", i)
+                self._attached.add(slot)
+            self.treeview.item(slot, values=values,
+                               tags=(parity, self._status_tags.get(status, 'status_default')))
+            self._slot_keys[slot] = key
+            if key == self._selected_key:
+                selected_slot = slot
+
+        current = self.treeview.selection()
+        if selected_slot is not None:
+            if current != (selected_slot,):
+                self.treeview.selection_set(selected_slot)
+        elif current:
+            self.treeview.selection_remove(*current)
+        # Os slots sempre cabem na área visível; o Treeview não deve rolar por conta própria
+        self.treeview.yview_moveto(0)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self._keys)
+        if not total:
+            self.scrollbar.set(0, 1)
+            return
+        self.scrollbar.set(self._offset / total, min(1.0, (self._offset + len(self._slots)) / total))
+
+    # ------------------------------------------------------------------
+    # Eventos
+    # ------------------------------------------------------------------
+    def _on_select(self, event=None):
+        # A seleção só é limpa pela própria tabela (quando a linha sai da área visível)
+        current = self.treeview.selection()
+        if current and current[0] in self._slot_keys:
+            self._selected_key = self._slot_keys[current[0]]
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self._offset = int(round(float(amount) * len(self._keys)))
+        elif action == 'scroll':
+            page = max(len(self._slots) - 1, 1)
+            self._offset += int(amount) * (page if unit == 'pages' else 1)
+        self._render()
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self._offset -= WHEEL_STEP
+        else:
+            self._offset += WHEEL_STEP
+        self._render()
+        return "break"
+
+    def _on_key(self, event):
+        page = max(len(self._slots) - 1, 1)
+        steps = {'Up': -1, 'Down': 1, 'Prior': -page, 'Next': page,
+                 'Home': -len(self._keys), 'End': len(self._keys)}
+        if event.keysym not in steps or not self._keys:
+            return None
+        position = self._positions.get(self._selected_key)
+        position = 0 if position is None else position + steps[event.keysym]
+        self.select(self._keys[max(0, min(position, len(self._keys) - 1))])
+        return "break"
@@ -13,6 +13,11 @@ GOOGLE_SHEETS_SCOPE = [
     "https://www.googleapis.com/auth/drive"
 ]
 
+CREDENTIALS_FILE = "credentials.json"
+
+# Planilha de logs, também usada para o cadastro de máquinas (aba 'Serial')
+LOGS_SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/15_0ArdsS89PRz1FmMmpTU9GQzETnUws6Ta-_TNCWITQ/edit?usp=sharing"
+
 ALL_COLUMNS_DETAIL = [
     'Valor', 'Carimbo de data/hora', 'Endereço de e-mail', 'Nome completo (sem abreviações):',
     'Ano de ingresso o PPG:', 'Curso:', 'Orientador', 'Possui bolsa?', 'Qual a agência de fomento?',
@@ -0,0 +1,185 @@
+# data_ingestion.py
+
+"""
+Etapa de tipagem dos dados da planilha. Converte datas, valores, CPF e
+colunas categóricas uma única vez por versão dos dados, para que a tabela,
+o histórico e as estatísticas não precisem refazer o parse a cada uso.
+
+As colunas originais são mantidas como vieram da planilha; os valores
+tipados ficam em colunas derivadas:
+
+- '<coluna>_dt'  datetime64 das colunas de data
+- '<coluna>_str' data formatada para exibição (dd/mm/aaaa)
+- 'CPF_norm'     CPF apenas com dígitos
+- 'Valor_cents'  valor liberado em centavos (int64)
+- 'Valor solicitado_cents' valor solicitado em centavos (int64)
+- 'Valor_num'    valor liberado em reais (Valor_cents / 100)
+- 'Id_num'       parte numérica do Id ('XXXX-YYYY' -> YYYY; -1 se inválido)
+
+As linhas cujo valor não pôde ser interpretado ficam com 0 centavos e são
+listadas em ``typed.attrs['money_parse_report']``.
+"""
+
+import pandas as pd
+
+DATE_COLUMNS = ['Carimbo de data/hora', 'Ultima Atualizacao']
+
+# O formulário grava 'dd/mm/aaaa' e o aplicativo grava 'Ultima Atualizacao' como 'dd-mm-aaaa'
+DATE_FORMATS = ['%d/%m/%Y %H:%M:%S', '%d-%m-%Y %H:%M:%S']
+
+CATEGORY_COLUMNS = [
+    'Status',
+    'Curso:',
+    'Qual a agência de fomento?',
+    'Motivo da solicitação'
+]
+
+
+def parse_dates(series):
+    """Converte uma coluna de datas aceitando os formatos usados na planilha."""
+    text = series.astype(str).str.strip()
+    parsed = pd.to_datetime(text, format=DATE_FORMATS[0], errors='coerce')
+    for fmt in DATE_FORMATS[1:]:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(text[missing], format=fmt, errors='coerce')
+    return parsed
+
+
+def normalize_cpf(value):
+    """Mantém apenas os dígitos de um CPF."""
+    return ''.join(ch for ch in str(value) if ch.isdigit())
+
+
+def normalize_cpf_series(series):
+    return series.astype(str).str.replace(r'\D', '', regex=True)
+
+
+# Coluna original -> coluna em centavos
+MONEY_COLUMNS = {
+    'Valor': 'Valor_cents',
+    'Valor solicitado. Somente valor, sem pontos e vírgula': 'Valor solicitado_cents',
+}
+
+_MONEY_PATTERN = r'^(-?)(\d+)(?:\.(\d+))?$'
+
+
+def parse_money_cents(series):
+    """Converte valores em formato brasileiro ('R$ 1.234,56', '1234', '') para centavos.
+
+    Retorna (centavos int64, máscara das células preenchidas que não puderam ser lidas).
+    Células vazias valem 0 e não contam como falha.
+    """
+    text = (
+        series.fillna('').astype(str)
+        .str.replace(r'(?i)r\$', '', regex=True)
+        .str.replace(r'\s', '', regex=True)
+    )
+    empty = text.isin(['', 'nan', 'None'])
+
+    # Com vírgula o ponto é separador de milhar; sem vírgula, só quando agrupa de 3 em 3 ('1.234')
+    thousands = text.str.contains(',', regex=False) | text.str.fullmatch(r'\d{1,3}(\.\d{3})+')
+    text = text.mask(thousands, text.str.replace('.', '', regex=False)).str.replace(',', '.', regex=False)
+
+    parts = text.str.extract(_MONEY_PATTERN)
+    failed = parts[1].isna() & ~empty
+
+    whole = pd.to_numeric(parts[1], errors='coerce').fillna(0).astype('int64')
+    fraction = parts[2].fillna('').str.ljust(3, '0')
+    cents = whole * 100 + fraction.str[:2].astype('int64')
+    cents += (fraction.str[2] >= '5').astype('int64')  # arredonda a terceira casa
+    cents = cents.where(parts[0] != '-', -cents)
+    return cents.where(~failed & ~empty, 0).astype('int64'), failed
+
+
+NAT_INT = pd.NaT.value  # NaT visto como inteiro: o menor int64
+
+
+def parse_id_numbers(series):
+    """Parte após o hífen dos Ids 'XXXX-YYYY' como inteiro; -1 para Ids vazios ou em outro formato."""
+    text = series.fillna('').astype(str).str.strip()
+    number = text.str.extract(r'^[^-]*-\s*(\d+)$')[0]
+    return pd.to_numeric(number, errors='coerce').fillna(-1).astype('int64')
+
+
+def default_order_keys(typed):
+    """Chave da ordenação padrão das tabelas para cada linha: Id decrescente, depois data decrescente.
+
+    Retorna {índice: chave}; ordenar as chaves em ordem crescente dá a ordem de exibição
+    (empates mantêm a ordem das linhas na planilha).
+    """
+    id_num = typed['Id_num'] if 'Id_num' in typed.columns else pd.Series(-1, index=typed.index)
+    created = typed.get('Carimbo de data/hora_dt')
+    # Datas como inteiros; NaT é o menor deles e fica depois das datas válidas
+    created_int = (created.values.view('int64').tolist() if created is not None
+                   else [NAT_INT] * len(typed))
+    return {key: (-number, -ticks, key)
+            for key, number, ticks in zip(typed.index, id_num.tolist(), created_int)}
+
+
+# Coluna exibida -> colunas tipadas usadas na ordenação, em ordem de prioridade
+SORT_KEYS = {
+    'Id': ['Id_num', 'Carimbo de data/hora_dt'],
+    'Carimbo de data/hora': ['Carimbo de data/hora_dt'],
+    'Carimbo de data/hora_str': ['Carimbo de data/hora_dt'],
+    'Ultima Atualizacao': ['Ultima Atualizacao_dt'],
+    'Ultima Atualizacao_str': ['Ultima Atualizacao_dt'],
+    'Valor': ['Valor_cents'],
+}
+
+TYPED_SORT_COLUMNS = list(dict.fromkeys(col for cols in SORT_KEYS.values() for col in cols))
+
+
+def sort_rows(typed, column, ascending=True):
+    """Índices de ``typed`` ordenados pela coluna exibida ``column``.
+
+    Id, datas e valores usam as colunas tipadas de ``SORT_KEYS``; as demais
+    são ordenadas pelo texto em minúsculas. A ordenação é estável: empates
+    mantêm a ordem atual das linhas, então ordenar por uma coluna e depois
+    por outra equivale a ordenar pelas duas. Valores ausentes ficam no
+    começo da ordem crescente e no fim da decrescente.
+    """
+    keys = [col for col in SORT_KEYS.get(column, []) if col in typed.columns]
+    if keys:
+        frame = typed[keys]
+    elif column in typed.columns:
+        values = typed[column].astype(object)
+        frame = values.where(values.notna(), '').astype(str).str.lower().to_frame()
+    else:
+        return typed.index
+    ordered = frame.sort_values(list(frame.columns), ascending=ascending, kind='stable',
+                                na_position='first' if ascending else 'last')
+    return ordered.index
+
+
+def build_typed_frame(df):
+    """Retorna uma cópia do DataFrame bruto com as colunas tipadas adicionadas."""
+    typed = df.copy()
+
+    for col in DATE_COLUMNS:
+        if col in typed.columns:
+            typed[f'{col}_dt'] = parse_dates(typed[col])
+            typed[f'{col}_str'] = typed[f'{col}_dt'].dt.strftime('%d/%m/%Y')
+
+    if 'Id' in typed.columns:
+        typed['Id_num'] = parse_id_numbers(typed['Id'])
+
+    if 'CPF:' in typed.columns:
+        typed['CPF_norm'] = normalize_cpf_series(typed['CPF:'])
+
+    report = {}
+    for col, cents_col in MONEY_COLUMNS.items():
+        if col in typed.columns:
+            typed[cents_col], failed = parse_money_cents(typed[col])
+            if failed.any():
+                report[col] = typed.loc[failed, col].to_dict()
+    if 'Valor_cents' in typed.columns:
+        typed['Valor_num'] = typed['Valor_cents'] / 100
+    typed.attrs['money_parse_report'] = report
+
+    for col in CATEGORY_COLUMNS:
+        if col in typed.columns:
+            typed[col] = typed[col].astype(str).astype('category')
+
+    return typed
@@ -0,0 +1,120 @@
+# data_snapshot.py
+
+"""
+Cópia local (SQLite) do último conjunto de dados carregado da planilha.
+Permite que a primeira tela seja exibida na abertura do aplicativo sem
+esperar o download completo, que é feito em seguida em segundo plano.
+
+As gravações em segundo plano passam por uma única thread: se várias versões
+chegarem enquanto uma gravação está em andamento, só a mais recente é
+gravada em seguida, e uma versão mais antiga nunca substitui uma mais nova.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+import logger_app
+
+
+def default_snapshot_path():
+    base_dir = os.getenv('APPDATA') or os.path.expanduser('~')
+    return os.path.join(base_dir, 'Financas-IG', 'cache', 'requests_snapshot.sqlite')
+
+
+class DataSnapshot:
+    def __init__(self, path=None):
+        self.path = path or default_snapshot_path()
+        self._lock = threading.Lock()       # protege _pending e _writer
+        self._save_lock = threading.Lock()  # uma gravação do arquivo por vez
+        self._pending = None                # (DataFrame, versão) aguardando gravação
+        self._writer = None
+        self._saved_version = None
+
+    def load(self):
+        """Retorna (DataFrame, versão dos dados) ou (None, 0) se não houver snapshot válido."""
+        if not os.path.exists(self.path):
+            return None, 0
+        try:
+            with closing(sqlite3.connect(self.path)) as conn:
+                meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+                columns = json.loads(meta['columns'])
+                rows = conn.execute("SELECT * FROM requests ORDER BY row_id").fetchall()
+            index = [row[0] for row in rows]
+            df = pd.DataFrame([list(row[1:]) for row in rows], columns=columns, index=index)
+            return df, int(meta.get('data_version', 0))
+        except Exception as e:
+            logger_app.log_error(f"Erro ao ler snapshot local dos dados: {str(e)}")
+            return None, 0
+
+    def save_in_background(self, df, data_version):
+        """Agenda a gravação de ``df``; versões que chegam durante uma gravação se resumem à mais recente."""
+        with self._lock:
+            if self._pending is None or data_version >= self._pending[1]:
+                self._pending = (df, data_version)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_pending, daemon=True)
+                self._writer.start()
+
+    def _write_pending(self):
+        while True:
+            with self._lock:
+                if self._pending is None:
+                    self._writer = None
+                    return
+                df, data_version = self._pending
+                self._pending = None
+            self.save(df, data_version)
+
+    def save(self, df, data_version):
+        """Grava o DataFrame de forma atômica (arquivo temporário + os.replace).
+
+        Versões mais antigas que a última gravada são ignoradas.
+        """
+        with self._save_lock:
+            if self._saved_version is not None and data_version < self._saved_version:
+                return True
+            if not self._write(df, data_version):
+                return False
+            self._saved_version = data_version
+            return True
+
+    def _write(self, df, data_version):
+        tmp_path = self.path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+            columns = [str(col) for col in df.columns]
+            # Colunas sem tipo declarado: o SQLite mantém inteiros e textos como vieram da planilha
+            column_defs = "".join(f", c{i}" for i in range(len(columns)))
+            placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+            rows = [
+                [int(idx)] + values
+                for idx, values in zip(df.index, df.astype(object).values.tolist())
+            ]
+
+            with closing(sqlite3.connect(tmp_path)) as conn:
+                conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+                conn.execute(f"CREATE TABLE requests (row_id INTEGER PRIMARY KEY{column_defs})")
+                conn.executemany(f"INSERT INTO requests VALUES ({placeholders})", rows)
+                conn.executemany(
+                    "INSERT INTO meta VALUES (?, ?)",
+                    [
+                        ('columns', json.dumps(columns, ensure_ascii=False)),
+                        ('data_version', str(data_version)),
+                        ('saved_at', datetime.now().strftime('%d/%m/%Y %H:%M:%S')),
+                    ]
+                )
+                conn.commit()
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            logger_app.log_error(f"Erro ao gravar snapshot local dos dados: {str(e)}")
+            return False
@@ -2,130 +2,763 @@
 
 import gspread
 import pandas as pd
-from oauth2client.service_account import ServiceAccountCredentials
+from collections import OrderedDict
 from datetime import datetime
+import threading
 import time
 
-from constants import GOOGLE_SHEETS_SCOPE
+from data_ingestion import MONEY_COLUMNS
+from data_snapshot import DataSnapshot
+from storage_backend import StorageBackend
+from retry_policy import RetryPolicy, SheetsUnavailableError, api_call, is_retryable
 import logger_app
+import sheets_client
 
-def api_call_handler(func):
-    def wrapper(*args, **kwargs):
-        for i in range(0, 10):
-            try:
-                return func(*args, **kwargs)
-            except Exception as e:
-                logger_app.log_error(f"API call failed: {str(e)}")
-                time.sleep(2 ** i)
-        error_msg = "The program couldn't connect to the Google Spreadsheet API for 10 times. Give up and check it manually."
-        logger_app.log_error(error_msg)
-        raise SystemError(error_msg)
-    return wrapper
-
-class GoogleSheetsHandler:
-    def __init__(self, credentials_file, sheet_url):
-        creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_file, GOOGLE_SHEETS_SCOPE)
-        self.client = gspread.authorize(creds)
-        self.sheet = self.client.open_by_url(sheet_url).sheet1
-        self.email_sheet = self.client.open_by_url(sheet_url).worksheet('Email')
+# Colunas lidas para detectar linhas novas ou alteradas sem baixar a planilha inteira
+DELTA_KEY_COLUMNS = ['Carimbo de data/hora', 'Id', 'Ultima Atualizacao']
+
+# Colunas mantidas como o texto da planilha: o numericise do gspread tira as vírgulas
+# ('12,50' viraria 1250) e os zeros à esquerda; data_ingestion faz a conversão delas
+TEXT_COLUMNS = set(MONEY_COLUMNS) | {'CPF:', 'Id'}
+
+
+def _numericise(column, value):
+    if column in TEXT_COLUMNS:
+        return value
+    return gspread.utils.numericise(value, default_blank='')
+
+
+# Campos de texto longo do formulário (prefixos dos cabeçalhos), carregados sob demanda
+LAZY_COLUMN_PREFIXES = (
+    'Endereço completo',
+    'Título do projeto',
+    'Nome do evento',
+    'Local de realização',
+    'Período de realização',
+    'Descrever detalhadamente',
+    'Descrever a solicitação',
+    'Dados bancários',
+    'Declaro',
+)
+
+class GoogleSheetsHandler(StorageBackend):
+    def __init__(self, credentials_file, sheet_url, data_ttl=120, write_behind=True,
+                 snapshot_path=None):
+        super().__init__()
+        # Cliente compartilhado com o logger e o MachineManager (ver sheets_client)
+        self.client = sheets_client.get_client(credentials_file)
+        # Prazo, novas tentativas e disjuntor das chamadas à API (ver retry_policy)
+        self.retry_policy = RetryPolicy(quota_caller='sheets_handler')
+        self.client.set_timeout(self.retry_policy.request_timeout)
+        self.sheet = sheets_client.open_spreadsheet(sheet_url, credentials_file).sheet1
+        self.email_sheet = sheets_client.get_worksheet(sheet_url, 'Email', credentials_file)
 
         self.column_indices = {name: idx + 1 for idx, name in enumerate(self.sheet.row_values(1))}
         self._notification_emails_cache = None
         self._last_cache_update = None
         self._cache_timeout = 300  # 5 minutos
 
-    @api_call_handler
-    def load_data(self):
-        records = self.sheet.get_all_records()
-        return pd.DataFrame(records)
-
-    @api_call_handler
-    def update_status(self, timestamp_value, new_status, user_name=None):
-        cell_list = self.sheet.col_values(self.column_indices['Carimbo de data/hora'])
-        for idx, cell_value in enumerate(cell_list[1:], start=2):
-            if cell_value == timestamp_value:
-                row_number = idx
-                self.sheet.update_cell(row_number, self.column_indices['Status'], new_status)
-                # Formato modificado para DD-MM-YYYY HH:mm:ss
-                current_timestamp = datetime.now().strftime('%d-%m-%Y %H:%M:%S')
-                self.sheet.update_cell(row_number, self.column_indices['Ultima Atualizacao'], current_timestamp)
-
-                if user_name and 'Ultima modificação' in self.column_indices:
-                    self.sheet.update_cell(row_number, self.column_indices['Ultima modificação'], user_name)
-
-                # Obtém o ID da solicitação
-                id_value = self.sheet.cell(row_number, self.column_indices.get('Id', 1)).value
-                
-                # Log incluindo o ID da solicitação
-                logger_app.log_data_change(
-                    user=user_name or "SYSTEM",
-                    action="UPDATE_STATUS",
-                    details=f"Status alterado para {new_status}, ID={id_value}, timestamp={timestamp_value}"
-                )
-                return True
-        return False
-
-    @api_call_handler
-    def update_value(self, timestamp_value, new_value, user_name=None):
-        cell_list = self.sheet.col_values(self.column_indices['Carimbo de data/hora'])
-        for idx, cell_value in enumerate(cell_list[1:], start=2):
-            if cell_value == timestamp_value:
-                row_number = idx
-                self.sheet.update_cell(row_number, self.column_indices['Valor'], new_value)
-                # Formato modificado para DD-MM-YYYY HH:mm:ss
-                current_timestamp = datetime.now().strftime('%d-%m-%Y %H:%M:%S')
-                self.sheet.update_cell(row_number, self.column_indices['Ultima Atualizacao'], current_timestamp)
-
-                if user_name and 'Ultima modificação' in self.column_indices:
-                    self.sheet.update_cell(row_number, self.column_indices['Ultima modificação'], user_name)
+        # Cache do conjunto de dados compartilhado por todas as telas
+        self._data_cache = None
+        self._data_loaded_at = None
+        self.data_ttl = data_ttl  # segundos
+
+        # Índices "carimbo de data/hora" -> linha e "Id" -> linha na planilha
+        self._row_by_timestamp = {}
+        self._row_by_id = {}
+
+        # Fila de gravação em segundo plano: (chave da linha, coluna) -> valor
+        self.write_behind = write_behind
+        self.flush_interval = 1.0  # segundos para agrupar rajadas de alterações
+        self._write_cond = threading.Condition()
+        self._pending_writes = OrderedDict()
+        self._inflight_writes = OrderedDict()
+        self._flush_requested = False
+        self._flusher = None
+
+        # Atualização incremental: a cada ``full_refresh_every`` sincronizações faz um download completo
+        self.full_refresh_every = 10
+        self._delta_refreshes = 0
+        self._full_load_generation = 0
+        self._fetch_sequence = 0      # número do download completo mais recente iniciado
+        self._installed_sequence = 0  # número do download completo instalado no cache
+
+        # Colunas de texto longo ficam fora do cache e são lidas por linha ao abrir os detalhes
+        header = self._header()
+        self.lazy_columns = [col for col in header if col.startswith(LAZY_COLUMN_PREFIXES)]
+        self.eager_columns = [col for col in header if col not in self.lazy_columns]
+        self._lazy_cache = {}  # carimbo de data/hora -> {coluna: valor}
+
+        # Snapshot local para abertura imediata e avisos de dados recarregados
+        self._snapshot = DataSnapshot(snapshot_path)
+        self._serving_snapshot = False
+        self._load_snapshot()
+
+    def load_data(self, force=False, columns=None):
+        """Retorna uma cópia do DataFrame da planilha a partir do cache em memória.
+
+        A planilha só é baixada novamente quando o cache está vazio, quando
+        expirou (``data_ttl``) ou quando ``force=True``. Cada recarga incrementa
+        ``data_version``, que pode ser usado como chave por caches derivados.
+        Enquanto os dados vierem do snapshot local, eles são devolvidos na hora
+        e a conferência com a planilha é feita em segundo plano.
+
+        Se a API estiver indisponível (``SheetsUnavailableError``) e já houver
+        dados em cache, eles são devolvidos sem atualização; ``api_degraded``
+        indica essa situação.
+
+        O cache guarda só as colunas de ``eager_columns``. Com ``columns`` o
+        retorno fica restrito a essas colunas; as de texto longo pedidas
+        explicitamente são lidas da planilha apenas para esta chamada.
+        """
+        with self._data_lock:
+            serving_snapshot = self._serving_snapshot
+            stale = force or not self._is_data_cache_fresh()
+        # O download acontece sem o lock: quem só lê o cache atual não espera pela rede
+        if serving_snapshot and not force:
+            self.refresh_in_background()
+        elif stale:
+            try:
+                self._reload_data()
+            except SheetsUnavailableError:
+                # Com a API instável a interface segue com os dados que já estão em cache
+                if self._data_cache is None:
+                    raise
+
+        with self._data_lock:
+            if columns is None:
+                return self._data_cache.copy()
+            cached = [col for col in columns if col in self._data_cache.columns]
+            df = self._data_cache[cached].copy()
+
+        missing = [col for col in columns if col not in cached and col in self.column_indices]
+        if missing:
+            fetched = self._fetch_columns(missing)
+            for col in missing:
+                values = fetched[col]
+                df[col] = [values[i] if 0 <= i < len(values) else '' for i in df.index]
+        return df.reindex(columns=[col for col in columns if col in df.columns])
+
+    @property
+    def column_names(self):
+        return list(self.column_indices)
+
+    @property
+    def api_degraded(self):
+        """True enquanto o disjuntor da API estiver aberto e os dados vierem só do cache."""
+        return self.retry_policy.circuit_breaker.is_open
+
+    def load_row_details(self, row_data):
+        """Completa uma linha do cache com as colunas de texto longo.
+
+        Os valores são lidos da planilha (um único intervalo da linha) na
+        primeira vez que a solicitação é aberta e ficam guardados por carimbo
+        de data/hora até o próximo download completo. Com a API indisponível a
+        linha volta sem eles (``api_degraded`` indica a situação).
+        """
+        key = row_data.get('Carimbo de data/hora', '')
+        if not self.lazy_columns or key in ('', None):
+            return row_data
+
+        with self._data_lock:
+            lazy_values = self._lazy_cache.get(str(key))
+        if lazy_values is None:
+            try:
+                row_number = self._locate_row(key)
+                if row_number is None:
+                    return row_data
+                lazy_values = self._fetch_lazy_values(row_number)
+            except (SheetsUnavailableError, gspread.exceptions.APIError) as e:
+                logger_app.log_warning(f"Detalhes da linha {key} sem os textos longos: {str(e)}")
+                return row_data
+            with self._data_lock:
+                self._lazy_cache[str(key)] = lazy_values
+
+        details = row_data.copy()
+        for col, value in lazy_values.items():
+            details[col] = value
+        return details
+
+    def get_row(self, key):
+        """Uma solicitação completa pela chave da tabela (o índice no DataFrame), ou None.
+
+        Com o cache em dia e os textos longos da linha já lidos, nada é
+        baixado. Caso contrário só a linha é lida, num único intervalo que traz
+        ao mesmo tempo as colunas do cache e as de texto longo; o cache é
+        atualizado com o que mudou nela. Se a leitura falhar, volta a linha do
+        cache, com os textos longos já lidos ou em branco.
+        """
+        with self._data_lock:
+            if self._data_cache is None or key not in self._data_cache.index:
+                return None
+            timestamp = ''
+            if 'Carimbo de data/hora' in self._data_cache.columns:
+                timestamp = str(self._data_cache.at[key, 'Carimbo de data/hora'])
+            lazy_values = self._lazy_cache.get(timestamp)
+            if self._is_data_cache_fresh() and (lazy_values is not None or not self.lazy_columns):
+                return self._row_with_details(key, lazy_values)
 
-                
-                # Obtém o ID da solicitação
-                id_value = self.sheet.cell(row_number, self.column_indices.get('Id', 1)).value
-                
-                logger_app.log_data_change(
-                    user=user_name or "SYSTEM", 
-                    action="UPDATE_VALUE",
-                    details=f"Valor alterado para {new_value}, ID={id_value}, timestamp={timestamp_value}"
-                )
-                return True
-        return False
-
-    @api_call_handler
-    def update_cell(self, timestamp_value, column_name, new_value):
-        cell_list = self.sheet.col_values(self.column_indices['Carimbo de data/hora'])
-        for idx, cell_value in enumerate(cell_list[1:], start=2):
-            if cell_value == timestamp_value:
-                row_number = idx
-                if column_name in self.column_indices:
-                    col_number = self.column_indices[column_name]
-                    self.sheet.update_cell(row_number, col_number, new_value)
-                    return True
-        return False
-
-    @api_call_handler
-    def update_observations(self, timestamp_value, observations):
-        """Atualiza as observações de uma solicitação específica."""
         try:
-            cell_list = self.sheet.col_values(self.column_indices['Carimbo de data/hora'])
-            for idx, cell_value in enumerate(cell_list[1:], start=2):
-                if cell_value == timestamp_value:
-                    row_number = idx
-                    if 'Observações' in self.column_indices:
-                        col_number = self.column_indices['Observações']
-                        self.sheet.update_cell(row_number, col_number, observations)
-                        logger_app.log_data_change(
-                            user="SYSTEM",
-                            action="UPDATE_OBSERVATIONS",
-                            details=f"Observações atualizadas para timestamp={timestamp_value}"
-                        )
-                        return True
-            return False
-        except Exception as e:
-            logger_app.log_error(f"Erro ao atualizar observações: {e}")
+            row_number = key + 2
+            record, fetched = self._row_record(self._fetch_row_values(row_number))
+            if timestamp and str(record.get('Carimbo de data/hora', '')) != timestamp:
+                # Linhas inseridas ou removidas na planilha: procura a solicitação pela chave
+                row_number = self._find_row(timestamp)
+                if row_number is None:
+                    return None
+                record, fetched = self._row_record(self._fetch_row_values(row_number))
+        except (SheetsUnavailableError, gspread.exceptions.APIError) as e:
+            # Sem a planilha a solicitação ainda abre com o que está em cache
+            logger_app.log_warning(f"Linha {key} lida do cache: {str(e)}")
+            with self._data_lock:
+                if self._data_cache is None or key not in self._data_cache.index:
+                    return None
+                if lazy_values is None:
+                    lazy_values = dict.fromkeys(self.lazy_columns, '')
+                return self._row_with_details(key, lazy_values)
+
+        lazy_values = fetched
+        with self._data_lock:
+            self._lazy_cache[str(record.get('Carimbo de data/hora', ''))] = lazy_values
+            idx = row_number - 2
+            if self._data_cache is None or idx not in self._data_cache.index:
+                return None
+            changed = {
+                col: value for col, value in record.items()
+                if col in self._data_cache.columns and str(self._data_cache.at[idx, col]) != str(value)
+            }
+            if changed:
+                self._set_cached_values(row_number, changed)
+                # Alterações locais ainda não gravadas continuam valendo sobre a leitura
+                self._reapply_pending_writes()
+                self._bump_version(modified=[idx])
+            return self._row_with_details(idx, lazy_values)
+
+    def _row_with_details(self, idx, lazy_values):
+        row = self._data_cache.loc[idx].copy()
+        for col, value in (lazy_values or {}).items():
+            row[col] = value
+        return row
+
+    def _load_snapshot(self):
+        df, version = self._snapshot.load()
+        if df is None or set(df.columns) != set(self.eager_columns):
+            return
+        with self._data_lock:
+            self._data_cache = df
+            self._data_loaded_at = None
+            self.data_version = version
+            self._serving_snapshot = True
+            self._rebuild_row_index()
+
+    def _save_snapshot(self, df, version):
+        self._snapshot.save_in_background(df, version)
+
+    def refresh(self):
+        """Sincroniza o cache com a planilha e retorna a nova versão dos dados."""
+        self._sync_data()
+        return self.data_version
+
+    def _is_data_cache_fresh(self):
+        if self._data_cache is None or self._data_loaded_at is None:
             return False
+        # Com o poller ativo o cache é mantido atualizado em segundo plano
+        if self.data_ttl is None or self.polling_active:
+            return True
+        return time.monotonic() - self._data_loaded_at < self.data_ttl
+
+    def _reload_data(self):
+        self._sync_data()
+
+    def _sync_data(self):
+        """Atualiza o cache de forma incremental quando possível, ou com download completo.
+
+        Os downloads acontecem fora do lock para não bloquear quem lê o cache
+        atual; por isso não deve ser chamado com ``_data_lock`` em mãos. Se dois
+        downloads completos correrem juntos, vale o que começou por último.
+        """
+        with self._data_lock:
+            generation = self._full_load_generation
+            use_delta = (self._data_cache is not None
+                         and self._delta_refreshes < self.full_refresh_every)
+        if use_delta:
+            changed_rows = self._fetch_delta()
+            if changed_rows is not None:
+                with self._data_lock:
+                    # Se outra thread fez um download completo nesse meio tempo, ele já é mais novo
+                    if generation == self._full_load_generation:
+                        self._apply_delta(changed_rows)
+                return
+
+        with self._data_lock:
+            self._fetch_sequence += 1
+            sequence = self._fetch_sequence
+        records = self._fetch_records()
+        with self._data_lock:
+            if sequence > self._installed_sequence:
+                self._installed_sequence = sequence
+                self._install_data(records)
+
+    def _install_data(self, records):
+        previous = self._data_cache
+        self._data_cache = pd.DataFrame(records, columns=self.eager_columns)
+        self._lazy_cache = {}
+        self._full_load_generation += 1
+        self._delta_refreshes = 0
+        self._data_loaded_at = time.monotonic()
+        was_snapshot = self._serving_snapshot
+        self._serving_snapshot = False
+        self._rebuild_row_index()
+
+        added, modified = self._diff_rows(previous, self._data_cache)
+        # Um download completo sem diferenças não gera nova versão (nem redesenho das telas)
+        if previous is None or was_snapshot or added or modified or len(previous) != len(self._data_cache):
+            self._bump_version(added, modified, full=True)
+            self._save_snapshot(self._data_cache.copy(), self.data_version)
+        self._reapply_pending_writes()
+
+    @staticmethod
+    def _diff_rows(previous, current):
+        """Índices de linhas novas e alteradas entre dois downloads."""
+        if previous is None:
+            return list(current.index), []
+        added = [idx for idx in current.index if idx not in previous.index]
+        common = current.index.intersection(previous.index)
+        columns = current.columns.intersection(previous.columns)
+        old = previous.loc[common, columns].astype(str)
+        new = current.loc[common, columns].astype(str)
+        modified = list(common[(old.values != new.values).any(axis=1)])
+        return added, modified
+
+    def _rebuild_row_index(self):
+        self._row_by_timestamp = {}
+        self._row_by_id = {}
+        timestamps = self._data_cache.get('Carimbo de data/hora', pd.Series(dtype=object))
+        ids = self._data_cache.get('Id', pd.Series(dtype=object))
+        for idx in self._data_cache.index:
+            self._index_row(idx + 2, timestamps.get(idx, ''), ids.get(idx, ''))
+
+    def _index_row(self, row_number, timestamp_value, id_value):
+        """Registra uma linha (nova ou existente) nos índices de localização."""
+        if timestamp_value not in (None, ''):
+            self._row_by_timestamp[str(timestamp_value)] = row_number
+        if id_value not in (None, ''):
+            self._row_by_id[str(id_value)] = row_number
+
+    def _find_row(self, key):
+        """Retorna o número da linha para um carimbo de data/hora ou Id, ou None.
+
+        A posição vem do índice em memória e é confirmada com a leitura de uma
+        única célula. Se a planilha mudou (linhas inseridas ou removidas), os
+        dados são recarregados e o índice reconstruído.
+        """
+        key = str(key)
+        if self._data_cache is None:
+            self._reload_data()
+        with self._data_lock:
+            candidates = [
+                (self._row_by_timestamp.get(key), 'Carimbo de data/hora'),
+                (self._row_by_id.get(key), 'Id'),
+            ]
+
+        for row_number, column_name in candidates:
+            if row_number is None or column_name not in self.column_indices:
+                continue
+            current = self._read_cell(row_number, self.column_indices[column_name])
+            if str(current) == key:
+                return row_number
+
+        self._reload_data()
+        with self._data_lock:
+            return self._row_by_timestamp.get(key) or self._row_by_id.get(key)
+
+    def _fetch_records(self):
+        """Baixa apenas as colunas do cache e monta os registros como ``get_all_records``."""
+        columns = self._fetch_columns(self.eager_columns)
+        row_count = max((len(values) for values in columns.values()), default=0)
+        return [
+            {col: values[i] if i < len(values) else '' for col, values in columns.items()}
+            for i in range(row_count)
+        ]
+
+    def _fetch_columns(self, column_names):
+        """Lê colunas inteiras (sem o cabeçalho) com um único ``batch_get``.
+
+        Colunas vizinhas são agrupadas no mesmo intervalo. Retorna
+        {coluna: [valores já convertidos para número quando aplicável]}; as de
+        ``TEXT_COLUMNS`` ficam como texto.
+        """
+        positions = sorted(self.column_indices[col] for col in column_names)
+        runs = []
+        for position in positions:
+            if runs and position == runs[-1][1] + 1:
+                runs[-1][1] = position
+            else:
+                runs.append([position, position])
+
+        ranges = [
+            f"{gspread.utils.rowcol_to_a1(2, start)}:{gspread.utils.rowcol_to_a1(1, end)[:-1]}"
+            for start, end in runs
+        ]
+        header = self._header()
+        columns = {}
+        for (start, end), value_range in zip(runs, self._fetch_ranges(ranges, major_dimension='COLUMNS')):
+            for position in range(start, end + 1):
+                offset = position - start
+                values = value_range[offset] if offset < len(value_range) else []
+                column = header[position - 1]
+                columns[column] = [_numericise(column, value) for value in values]
+        return columns
+
+    def _fetch_lazy_values(self, row_number):
+        return self._row_record(self._fetch_row_values(row_number))[1]
+
+    def _fetch_row_values(self, row_number):
+        """Lê a linha inteira (todas as colunas) num único intervalo."""
+        last_letter = gspread.utils.rowcol_to_a1(1, len(self.column_indices))[:-1]
+        value_range = self._fetch_ranges([f"A{row_number}:{last_letter}{row_number}"])[0]
+        return value_range[0] if value_range else []
+
+    def _row_record(self, values):
+        """Valores de uma linha -> (registro com números convertidos, {coluna de texto longo: valor})."""
+        header = self._header()
+        values = (list(values) + [''] * len(header))[:len(header)]
+        record = {col: _numericise(col, value) for col, value in zip(header, values)}
+        lazy_values = {col: values[self.column_indices[col] - 1] for col in self.lazy_columns}
+        return record, lazy_values
+
+    @api_call
+    def _read_cell(self, row_number, col_number):
+        return self.sheet.cell(row_number, col_number).value
+
+    @api_call
+    def _fetch_ranges(self, ranges, major_dimension=None):
+        return self.sheet.batch_get(ranges, major_dimension=major_dimension)
+
+    def _header(self):
+        return sorted(self.column_indices, key=self.column_indices.get)
+
+    def _column_letter(self, column_name):
+        return gspread.utils.rowcol_to_a1(1, self.column_indices[column_name])[:-1]
+
+    def _fetch_delta(self):
+        """Descobre as linhas novas ou alteradas lendo só as colunas de chave.
+
+        Um único ``batch_get`` traz 'Carimbo de data/hora', 'Id' e 'Ultima
+        Atualizacao'; elas são comparadas com o cache e apenas as linhas
+        diferentes são baixadas por intervalo. Retorna {linha: valores} ou None
+        quando linhas foram removidas/reordenadas e é preciso recarregar tudo.
+        """
+        key_columns = [col for col in DELTA_KEY_COLUMNS if col in self.column_indices]
+        if 'Carimbo de data/hora' not in key_columns:
+            return None
+
+        with self._data_lock:
+            cached = self._data_cache.reindex(columns=key_columns).astype(str).values.tolist()
+
+        ranges = [f"{self._column_letter(col)}2:{self._column_letter(col)}" for col in key_columns]
+        remote_columns = [
+            value_range[0] if value_range else []
+            for value_range in self._fetch_ranges(ranges, major_dimension='COLUMNS')
+        ]
+        remote_rows = max(len(values) for values in remote_columns)
+        if remote_rows < len(cached):
+            return None
+
+        changed = []
+        for i in range(remote_rows):
+            remote = [str(values[i]) if i < len(values) else '' for values in remote_columns]
+            if i >= len(cached):
+                changed.append(i + 2)
+            elif remote[0] != cached[i][0]:
+                # O carimbo de uma linha existente mudou: linhas foram inseridas ou removidas
+                return None
+            elif remote != cached[i]:
+                changed.append(i + 2)
+
+        if len(changed) > max(50, remote_rows // 2):
+            return None
+        if not changed:
+            return {}
+
+        last_letter = gspread.utils.rowcol_to_a1(1, len(self.column_indices))[:-1]
+        row_ranges = []
+        start = end = changed[0]
+        for row_number in changed[1:] + [None]:
+            if row_number == end + 1:
+                end = row_number
+                continue
+            row_ranges.append((start, end))
+            if row_number is not None:
+                start = end = row_number
+
+        fetched = self._fetch_ranges([f"A{start}:{last_letter}{end}" for start, end in row_ranges])
+        changed_rows = {}
+        for (start, end), value_range in zip(row_ranges, fetched):
+            for row_number in range(start, end + 1):
+                offset = row_number - start
+                changed_rows[row_number] = value_range[offset] if offset < len(value_range) else []
+        return changed_rows
+
+    def _apply_delta(self, changed_rows):
+        self._delta_refreshes += 1
+        self._data_loaded_at = time.monotonic()
+        self._serving_snapshot = False
+        if not changed_rows:
+            return
+
+        new_records = {}
+        modified = []
+        for row_number, values in sorted(changed_rows.items()):
+            record, lazy_values = self._row_record(values)
+            # A linha inteira já foi lida: aproveita para renovar as colunas de texto longo
+            self._lazy_cache[str(record.get('Carimbo de data/hora', ''))] = lazy_values
+            idx = row_number - 2
+            if idx in self._data_cache.index:
+                self._set_cached_values(row_number, record)
+                modified.append(idx)
+            else:
+                new_records[idx] = record
+            self._index_row(row_number, record.get('Carimbo de data/hora', ''), record.get('Id', ''))
+
+        if new_records:
+            added = pd.DataFrame.from_dict(new_records, orient='index', columns=self._data_cache.columns)
+            self._data_cache = pd.concat([self._data_cache, added])
+
+        self._bump_version(sorted(new_records), modified)
+        self._save_snapshot(self._data_cache.copy(), self.data_version)
+        self._reapply_pending_writes()
+
+    def _update_cached_row(self, row_number, changes):
+        """Aplica alterações de uma linha no cache, sem novo download."""
+        with self._data_lock:
+            if self._data_cache is None:
+                return
+            self._set_cached_values(row_number, changes)
+            self._bump_version(modified=[row_number - 2])
+
+    def _set_cached_values(self, row_number, changes):
+        idx = row_number - 2  # linha 1 é o cabeçalho
+        if idx not in self._data_cache.index:
+            return
+        for column_name, value in changes.items():
+            if column_name not in self._data_cache.columns:
+                if column_name in self.lazy_columns:
+                    self._set_lazy_value(idx, column_name, value)
+                continue
+            if self._data_cache[column_name].dtype != object:
+                self._data_cache[column_name] = self._data_cache[column_name].astype(object)
+            self._data_cache.at[idx, column_name] = value
+
+    def _set_lazy_value(self, idx, column_name, value):
+        if 'Carimbo de data/hora' not in self._data_cache.columns:
+            return
+        lazy_values = self._lazy_cache.get(str(self._data_cache.at[idx, 'Carimbo de data/hora']))
+        if lazy_values is not None:
+            lazy_values[column_name] = value
+
+    def _reapply_pending_writes(self):
+        """Mantém no cache recém-carregado as alterações que ainda não chegaram à planilha."""
+        with self._write_cond:
+            pending = list(self._inflight_writes.items()) + list(self._pending_writes.items())
+        for (row_key, column_name), value in pending:
+            row_number = self._row_by_timestamp.get(row_key) or self._row_by_id.get(row_key)
+            if row_number is not None:
+                self._set_cached_values(row_number, {column_name: value})
+
+    def _locate_row(self, key):
+        """Localiza a linha pelo índice em memória; só acessa a planilha se a chave for desconhecida."""
+        if self._data_cache is None:
+            self._reload_data()
+        with self._data_lock:
+            row_number = self._row_by_timestamp.get(str(key)) or self._row_by_id.get(str(key))
+        if row_number is None:
+            row_number = self._find_row(key)
+        return row_number
+
+    def _cell_updates(self, row_number, changes):
+        """Monta os intervalos A1 de uma linha para ``sheet.batch_update``."""
+        return [
+            {
+                'range': gspread.utils.rowcol_to_a1(row_number, self.column_indices[column_name]),
+                'values': [[value]],
+            }
+            for column_name, value in changes.items()
+            if column_name in self.column_indices
+        ]
+
+    def _cached_value(self, row_number, column_name, default=''):
+        with self._data_lock:
+            idx = row_number - 2
+            if (self._data_cache is None or column_name not in self._data_cache.columns
+                    or idx not in self._data_cache.index):
+                return default
+            return self._data_cache.at[idx, column_name]
+
+    # ------------------------------------------------------------------
+    # Fila de gravação em segundo plano
+    # ------------------------------------------------------------------
+    @property
+    def pending_writes(self):
+        """Número de células alteradas que ainda não foram gravadas na planilha."""
+        with self._write_cond:
+            return len(self._pending_writes) + len(self._inflight_writes)
+
+    def _queue_write(self, key, row_number, changes):
+        """Atualiza o cache imediatamente e agenda a gravação das células na planilha."""
+        row_key = str(self._cached_value(row_number, 'Carimbo de data/hora') or key)
+        self._update_cached_row(row_number, changes)
+
+        if not self.write_behind:
+            self._write_rows([(row_key, changes)])
+            return
+
+        with self._write_cond:
+            for column_name, value in changes.items():
+                cell = (row_key, column_name)
+                # Reinsere no fim para que a ordem de gravação siga a ordem das ações
+                self._pending_writes.pop(cell, None)
+                self._pending_writes[cell] = value
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+            self._write_cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Aguarda a gravação de todas as alterações pendentes.
+
+        Retorna False se o tempo limite esgotar antes da fila esvaziar.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._write_cond:
+            self._flush_requested = True
+            self._write_cond.notify_all()
+            try:
+                while self._pending_writes or self._inflight_writes:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._write_cond.wait(remaining)
+                return True
+            finally:
+                self._flush_requested = False
+
+    def _flush_loop(self):
+        while True:
+            with self._write_cond:
+                while not self._pending_writes:
+                    self._write_cond.wait()
+                # Aguarda um pouco para agrupar alterações feitas em sequência
+                deadline = time.monotonic() + self.flush_interval
+                while not self._flush_requested:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._write_cond.wait(remaining)
+                batch = self._pending_writes
+                self._pending_writes = OrderedDict()
+                self._inflight_writes = batch
+
+            failed = dropped = False
+            try:
+                self._write_rows(self._group_writes_by_row(batch))
+            except Exception as e:
+                if isinstance(e, SheetsUnavailableError) or is_retryable(e):
+                    failed = True
+                    logger_app.log_error(f"Erro ao gravar alterações pendentes: {str(e)}")
+                else:
+                    # Erro permanente (sem permissão, intervalo inválido...): repetir não adianta
+                    cells = ", ".join(f"{row_key}/{column_name}" for row_key, column_name in batch)
+                    logger_app.log_error(f"Alterações descartadas ({cells}): {str(e)}")
+                    dropped = True
+
+            if dropped:
+                # Sai da fila antes da recarga, para não ser reaplicado ao cache novo
+                with self._write_cond:
+                    self._inflight_writes = OrderedDict()
+                self._discard_cached_changes()
+            with self._write_cond:
+                if failed:
+                    # Devolve o lote à frente da fila; valores mais novos da mesma célula prevalecem
+                    merged = OrderedDict(
+                        (cell, value) for cell, value in batch.items()
+                        if cell not in self._pending_writes
+                    )
+                    merged.update(self._pending_writes)
+                    self._pending_writes = merged
+                self._inflight_writes = OrderedDict()
+                self._write_cond.notify_all()
+            if failed:
+                time.sleep(self.flush_interval * 5)
+
+    def _discard_cached_changes(self):
+        """Faz a próxima leitura baixar a planilha inteira, trocando no cache as alterações não gravadas."""
+        with self._data_lock:
+            self._data_loaded_at = None
+            self._delta_refreshes = self.full_refresh_every
+
+    @staticmethod
+    def _group_writes_by_row(batch):
+        rows = OrderedDict()
+        for (row_key, column_name), value in batch.items():
+            rows.setdefault(row_key, {})[column_name] = value
+        return list(rows.items())
+
+    def _write_rows(self, items):
+        """Grava alterações de várias linhas com uma leitura de conferência e um ``batch_update``.
+
+        Cada chamada à API (conferência, recarga e gravação) tem as próprias
+        tentativas; o método em si não é repetido.
+        """
+        rows = self._resolve_rows([row_key for row_key, _ in items])
+        data = []
+        for row_key, changes in items:
+            row_number = rows.get(row_key)
+            if row_number is None:
+                logger_app.log_error(f"Solicitação não encontrada na planilha: timestamp={row_key}")
+                continue
+            data.extend(self._cell_updates(row_number, changes))
+        if data:
+            self._batch_update(data)
+
+    @api_call
+    def _batch_update(self, data):
+        return self.sheet.batch_update(data, raw=False)
+
+    def _resolve_rows(self, keys):
+        """Confere, com um único ``batch_get``, se as linhas do índice ainda correspondem às chaves."""
+        if self._data_cache is None:
+            self._reload_data()
+        with self._data_lock:
+            located = {}
+            for key in keys:
+                if key in self._row_by_timestamp:
+                    located[key] = (self._row_by_timestamp[key], 'Carimbo de data/hora')
+                elif key in self._row_by_id:
+                    located[key] = (self._row_by_id[key], 'Id')
+
+        ranges = [
+            gspread.utils.rowcol_to_a1(row_number, self.column_indices[column_name])
+            for row_number, column_name in located.values()
+        ]
+        current = self._fetch_ranges(ranges) if ranges else []
+        stale = len(located) < len(keys)
+        for key, value_range in zip(located, current):
+            value = value_range[0][0] if value_range and value_range[0] else ''
+            if str(value) != key:
+                stale = True
+
+        if not stale:
+            return {key: row_number for key, (row_number, _) in located.items()}
+
+        self._reload_data()
+        with self._data_lock:
+            return {
+                key: self._row_by_timestamp.get(key) or self._row_by_id.get(key)
+                for key in keys
+            }
 
-    @api_call_handler 
+    @api_call
     def get_notification_emails(self):
         """Retorna os emails de notificação da aba Email"""
         try:
@@ -168,7 +801,7 @@ class GoogleSheetsHandler:
             logger_app.log_error(f"Erro ao obter emails de notificação: {str(e)}")
             return {}
 
-    @api_call_handler
+    @api_call
     def update_notification_emails(self, column, emails):
         """Atualiza os emails de notificação para uma coluna específica"""
         try:
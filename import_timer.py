@@ -0,0 +1,66 @@
+# import_timer.py
+
+"""
+Medição do tempo de importação dos módulos na abertura do aplicativo.
+
+Com ``FINANCAS_IG_IMPORT_TIMES=1``, cada importação de primeiro nível (a que
+não acontece dentro de outra) é cronometrada, incluindo as dependências que
+ela puxa. ``report()`` mostra no console os módulos mais lentos e o tempo
+desde o início do processo, para comparar a abertura nas máquinas do
+laboratório.
+"""
+
+import builtins
+import os
+import sys
+import threading
+import time
+
+ENV_VAR = 'FINANCAS_IG_IMPORT_TIMES'
+
+_started_at = time.perf_counter()
+_timings = {}  # módulo -> segundos, somando as dependências carregadas junto
+_local = threading.local()
+_original_import = None
+
+
+def enabled():
+    return _original_import is not None
+
+
+def install_from_env():
+    if os.getenv(ENV_VAR) == '1':
+        install()
+
+
+def install():
+    global _original_import
+    if _original_import is not None:
+        return
+    _original_import = builtins.__import__
+
+    def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        # Importações relativas e módulos já carregados não custam nada a medir
+        if level or name in sys.modules:
+            return _original_import(name, globals, locals, fromlist, level)
+        depth = getattr(_local, 'depth', 0)
+        _local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            return _original_import(name, globals, locals, fromlist, level)
+        finally:
+            _local.depth = depth
+            if depth == 0:
+                _timings[name] = _timings.get(name, 0.0) + time.perf_counter() - start
+
+    builtins.__import__ = timed_import
+
+
+def report(label, limit=15):
+    """Mostra os ``limit`` módulos mais lentos e o tempo total até ``label``."""
+    if not enabled():
+        return
+    total = time.perf_counter() - _started_at
+    print(f"[import] {label}: {total:.2f}s desde o início")
+    for name, seconds in sorted(_timings.items(), key=lambda item: item[1], reverse=True)[:limit]:
+        print(f"[import]   {seconds * 1000:8.1f} ms  {name}")
@@ -1,13 +1,15 @@
 import datetime
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import logging
 import os
 import json
 from enum import Enum
 
+import quota_governor
+import sheets_client
+from constants import CREDENTIALS_FILE, LOGS_SPREADSHEET_URL
+
 # URL da planilha de logs
-SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/15_0ArdsS89PRz1FmMmpTU9GQzETnUws6Ta-_TNCWITQ/edit?usp=sharing"
+SPREADSHEET_URL = LOGS_SPREADSHEET_URL
 
 # Nome das abas para diferentes tipos de logs
 SHEETS = {
@@ -30,63 +32,37 @@ class LogCategory(Enum):
     SECURITY = "SECURITY"
     EMAIL = "EMAIL"
 
-# Configuração do escopo e credenciais
-scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-credentials_file = "credentials.json"
-
-# Variáveis globais para spreadsheet e worksheets
-_spreadsheet = None
-_worksheets = {}
-_last_auth_time = None
-_auth_timeout = 3500  # 58 minutos
+# Cliente, planilha e abas de log são compartilhados via sheets_client
+LOG_QUOTA_TIMEOUT = 2  # segundos aguardando cota antes de desistir do log remoto
+LOG_HEADER = [
+    "Timestamp", "Level", "Category", "User",
+    "Action", "Details", "IP", "Status"
+]
 
 def reauthorize():
-    """Reconecta com o Google Sheets se necessário"""
-    global _spreadsheet, _last_auth_time
-    
-    current_time = datetime.datetime.now()
-    if (_last_auth_time is None or 
-        (current_time - _last_auth_time).total_seconds() > _auth_timeout):
-        try:
-            creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_file, scope)
-            client = gspread.authorize(creds)
-            _spreadsheet = client.open_by_url(SPREADSHEET_URL)
-            _last_auth_time = current_time
-            
-            # Limpa cache de worksheets quando reautoriza
-            _worksheets.clear()
-        except Exception as e:
-            logging.error(f"Erro ao reautorizar: {str(e)}")
-            return False
+    """Garante que o cliente compartilhado está autorizado (a renovação do token é automática)"""
+    try:
+        sheets_client.get_client(CREDENTIALS_FILE)
+    except Exception as e:
+        logging.error(f"Erro ao reautorizar: {str(e)}")
+        return False
     return True
 
 def get_spreadsheet():
-    """Função para obter ou criar conexão com spreadsheet"""
-    if not reauthorize():
+    """Função para obter a planilha de logs"""
+    try:
+        return sheets_client.open_spreadsheet(SPREADSHEET_URL, CREDENTIALS_FILE)
+    except Exception as e:
+        logging.error(f"Erro ao abrir planilha de logs: {str(e)}")
         return None
-    return _spreadsheet
 
 def get_worksheet(sheet_name):
     """Função para obter ou criar worksheet"""
-    if sheet_name not in _worksheets or not reauthorize():
-        try:
-            spreadsheet = get_spreadsheet()
-            if not spreadsheet:
-                return None
-            
-            try:
-                worksheet = spreadsheet.worksheet(sheet_name)
-            except gspread.exceptions.WorksheetNotFound:
-                worksheet = spreadsheet.add_worksheet(title=sheet_name, rows="1000", cols="10")
-                worksheet.append_row([
-                    "Timestamp", "Level", "Category", "User", 
-                    "Action", "Details", "IP", "Status"
-                ])
-            _worksheets[sheet_name] = worksheet
-        except Exception as e:
-            logging.error(f"Erro ao obter worksheet {sheet_name}: {e}")
-            return None
-    return _worksheets[sheet_name]
+    try:
+        return sheets_client.get_worksheet(SPREADSHEET_URL, sheet_name, CREDENTIALS_FILE, header=LOG_HEADER)
+    except Exception as e:
+        logging.error(f"Erro ao obter worksheet {sheet_name}: {e}")
+        return None
 
 def setup_logger():
     """Configura o logger do sistema"""
@@ -113,7 +89,11 @@ def append_log(level: LogLevel, category: LogCategory, user: str, action: str,
         
         # Log no Google Sheets
         worksheet = get_worksheet(SHEETS[level.value])
-        if worksheet:
+        # Gravação remota de log tem a menor prioridade na cota; se não houver ficha, fica só no log local
+        if worksheet and not quota_governor.acquire('logger', priority=quota_governor.LOW,
+                                                    timeout=LOG_QUOTA_TIMEOUT):
+            logging.warning(f"Cota da API esgotada; log mantido apenas localmente: {msg}")
+        elif worksheet:
             log_entry = [
                 timestamp,
                 level.value,
@@ -175,6 +155,25 @@ def log_error(error_msg: str, user: str = "SYSTEM"):
         status="ERROR"
     )
 
+def log_warning(message: str, user: str = "SYSTEM"):
+    return append_log(
+        LogLevel.INFO,
+        LogCategory.SYSTEM,
+        user,
+        "WARNING",
+        message,
+        status="WARNING"
+    )
+
+def log_info(message: str, user: str = "SYSTEM"):
+    return append_log(
+        LogLevel.INFO,
+        LogCategory.SYSTEM,
+        user,
+        "INFO",
+        message
+    )
+
 def log_email(user: str, recipient: str, subject: str, status: str = "SUCCESS"):
     return append_log(
         LogLevel.INFO,
@@ -209,6 +208,7 @@ def get_logs(level: LogLevel = None, category: LogCategory = None,
                 continue
                 
             try:
+                quota_governor.acquire('logger')
                 records = worksheet.get_all_records()
             except Exception as e:
                 logging.error(f"Erro ao buscar registros de {sheet_name}: {e}")
@@ -114,7 +114,7 @@ def hash_password(password):
     return hashlib.sha256(password.encode('utf-8')).hexdigest()
 
 class LoginWindow:
-    def __init__(self):
+    def __init__(self, prefetch=None):
         self.window = tk.Tk()
         # Define a opção global de fundo para que todos os widgets herdem essa cor
         self.window.option_add("*Background", "#2C3E50")
@@ -131,6 +131,8 @@ class LoginWindow:
         
         self.username = None
         self.role = None
+        # Etapas de rede já em andamento (ver startup.StartupPrefetch)
+        self.prefetch = prefetch
 
         self._build_ui()
         self.center_window()
@@ -290,9 +292,12 @@ class LoginWindow:
                 if USERS_DB[user]["hashed_password"] == hash_password(password+user):
                     is_admin_a5 = USERS_DB[user].get("role") == "A5"
                     
-                    # Verifica autorização da máquina
-                    machine_manager = MachineManager("credentials.json")
-                    if machine_manager.is_machine_authorized(is_admin_a5):
+                    # Verifica autorização da máquina (já iniciada em segundo plano, se houver prefetch)
+                    if self.prefetch is not None:
+                        authorized = self.prefetch.is_machine_authorized(is_admin_a5)
+                    else:
+                        authorized = MachineManager("credentials.json").is_machine_authorized(is_admin_a5)
+                    if authorized:
                         self.username = user
                         self.role = USERS_DB[user]["role"]
                         self.window.destroy()
@@ -312,7 +317,7 @@ class LoginWindow:
             return (None, None)
         return (self.username, self.role)
 
-def show_login():
-    login_screen = LoginWindow()
+def show_login(prefetch=None):
+    login_screen = LoginWindow(prefetch)
     username, role = login_screen.run()
     return (username, role)
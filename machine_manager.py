@@ -2,15 +2,16 @@ from datetime import datetime
 import os
 import json
 import uuid
-import gspread
-from cryptography.fernet import Fernet
 import winreg
 import logger_app
+import quota_governor
+import sheets_client
+from constants import LOGS_SPREADSHEET_URL
 
 class MachineManager:
     def __init__(self, credentials_file):
         self.credentials_file = credentials_file
-        self.logs_sheet_url = "https://docs.google.com/spreadsheets/d/15_0ArdsS89PRz1FmMmpTU9GQzETnUws6Ta-_TNCWITQ/edit?usp=sharing"
+        self.logs_sheet_url = LOGS_SPREADSHEET_URL
         
         # Ajuste para criar diretório base do app
         self.app_data_base = os.path.join(os.getenv('APPDATA'), 'Financas-IG')
@@ -25,7 +26,8 @@ class MachineManager:
                 except Exception as e:
                     logger_app.log_error(f"Erro ao criar diretório {path}: {str(e)}")
 
-        # Chave para encriptação local
+        # Chave para encriptação local (cryptography é importado só aqui, fora do caminho da tela de login)
+        from cryptography.fernet import Fernet
         self.key_b = Fernet.generate_key()
         self.fernet_b = Fernet(self.key_b)
 
@@ -41,16 +43,11 @@ class MachineManager:
             return str(uuid.uuid1())
 
     def _get_serial_worksheet(self):
-        client = gspread.service_account(filename=self.credentials_file)
-        sheet = client.open_by_url(self.logs_sheet_url)
-        
-        try:
-            worksheet = sheet.worksheet('Serial')
-        except:
-            worksheet = sheet.add_worksheet(title='Serial', rows="1000", cols="5")  # Alterado para 5 colunas
-            # Adiciona cabeçalho correto
-            worksheet.append_row(["Machine Info", "Key", "Hostname", "Last IP", "Added Date"])
-        return worksheet
+        # Cliente e aba compartilhados com o logger; a aba é criada com o cabeçalho se não existir
+        return sheets_client.get_worksheet(
+            self.logs_sheet_url, 'Serial', self.credentials_file,
+            header=["Machine Info", "Key", "Hostname", "Last IP", "Added Date"], cols=5
+        )
 
     def _get_machine_info(self):
         """Obtém informações detalhadas da máquina"""
@@ -84,6 +81,7 @@ class MachineManager:
             
             # Verifica se máquina já está registrada na planilha
             worksheet = self._get_serial_worksheet()
+            quota_governor.acquire('machine_manager')
             registered_machines = worksheet.get_all_records(expected_headers=["Machine Info", "Key", "Hostname", "Last IP", "Added Date"])
             
             # Procura e remove registro anterior se existir
@@ -91,11 +89,13 @@ class MachineManager:
             for machine in registered_machines:
                 if machine.get('Hostname') == machine_info['hostname']:
                     # Remove o registro antigo
+                    quota_governor.acquire('machine_manager')
                     worksheet.delete_rows(row_index)
                     break
                 row_index += 1
 
             # Gera nova chave e encripta dados
+            from cryptography.fernet import Fernet
             key_a = Fernet.generate_key()
             fernet_a = Fernet(key_a)
             
@@ -110,6 +110,7 @@ class MachineManager:
                 machine_info['ip'],       # Last IP
                 machine_info['date_added'] # Added Date
             ]
+            quota_governor.acquire('machine_manager')
             worksheet.append_row(new_row)
             
             # Salva localmente
@@ -175,6 +176,7 @@ class MachineManager:
                 
             # Carrega dados da planilha
             worksheet = self._get_serial_worksheet()
+            quota_governor.acquire('machine_manager')
             registered_machines = worksheet.get_all_values()
             
             # Remove cabeçalho
@@ -182,6 +184,7 @@ class MachineManager:
                 registered_machines = registered_machines[1:]
             
             # Verifica cada máquina registrada
+            from cryptography.fernet import Fernet
             for machine_info, key_a, hostname, ip, date in registered_machines:
                 try:
                     # Tenta descriptografar com a chave da planilha
@@ -209,6 +212,7 @@ class MachineManager:
             expected_headers = ["Machine Info", "Key", "Hostname", "Last IP", "Added Date"]
             
             # Usa get_all_records com os cabeçalhos esperados
+            quota_governor.acquire('machine_manager')
             records = worksheet.get_all_records(expected_headers=expected_headers)
             valid_rows = []
             
@@ -231,6 +235,7 @@ class MachineManager:
     def remove_machine(self, row_index):
         try:
             worksheet = self._get_serial_worksheet()
+            quota_governor.acquire('machine_manager')
             worksheet.delete_rows(row_index)
             return True
         except Exception as e:
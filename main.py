@@ -2,9 +2,16 @@
 
 import os
 import sys
+
+# FINANCAS_IG_IMPORT_TIMES=1 mede as importações a partir daqui (ver import_timer)
+import import_timer
+import_timer.install_from_env()
+
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from login import show_login
+from startup import StartupPrefetch
+from sqlite_backend import SQLiteBackend
 from google_sheets_handler import GoogleSheetsHandler
 from email_sender import EmailSender
 from app.main_app import App
@@ -13,7 +20,23 @@ from app.main_app import App
 import logger_app  # nossa camada de logs
 
 def main():
-    username, user_role = show_login()
+    # Credenciais e URL da planilha
+    credentials_file = "credentials.json"
+    sheet_url = "https://docs.google.com/spreadsheets/d/1sNwhkq0nCuTMRhs2HmahV88uIn9KiXY1ex0vlOwC0O8/edit?usp=sharing"  # Ajuste p/ sua planilha
+
+    # FINANCAS_IG_BACKEND=sqlite usa o banco local (FINANCAS_IG_SQLITE_PATH) no lugar da planilha
+    handler_factory = None
+    if os.getenv('FINANCAS_IG_BACKEND', 'sheets').lower() == 'sqlite':
+        def handler_factory():
+            backend = SQLiteBackend(os.getenv('FINANCAS_IG_SQLITE_PATH'))
+            # Banco ainda vazio (ou FINANCAS_IG_SQLITE_IMPORT=1): copia a planilha antes do primeiro uso
+            if not backend.column_names or os.getenv('FINANCAS_IG_SQLITE_IMPORT') == '1':
+                backend.import_from(GoogleSheetsHandler(credentials_file, sheet_url))
+            return backend
+
+    # Autorização da máquina, abertura da planilha e primeira carga começam junto com a tela de login
+    prefetch = StartupPrefetch(sheet_url, credentials_file, handler_factory)
+    username, user_role = show_login(prefetch)
 
     if not user_role:
         # Se user_role for None, significa que o login foi cancelado/fechado
@@ -23,20 +46,17 @@ def main():
     # Configura logger
     logger_app.setup_logger()
 
-    # Credenciais e URL da planilha
-    credentials_file = "credentials.json"
-    sheet_url = "https://docs.google.com/spreadsheets/d/1sNwhkq0nCuTMRhs2HmahV88uIn9KiXY1ex0vlOwC0O8/edit?usp=sharing"  # Ajuste p/ sua planilha
-
     smtp_server = "smtp.gmail.com"
     smtp_port = 587
     sender_email = "financas.ig.nubia@gmail.com"
 
-    sheets_handler = GoogleSheetsHandler(credentials_file, sheet_url)
+    sheets_handler = prefetch.get_handler()
     email_sender = EmailSender(smtp_server, smtp_port, sender_email)
 
     root = tb.Window(themename='flatly')
 
     app = App(root, sheets_handler, email_sender, user_role, user_name=username)
+    import_timer.report("janela principal")
 
     root.mainloop()
 
@@ -0,0 +1,126 @@
+# quota_governor.py
+
+"""
+Controle único da cota de requisições à API do Google Sheets.
+
+Todas as partes do aplicativo (dados das solicitações, logs e controle de
+máquinas) usam a mesma credencial e, portanto, a mesma cota de ~60
+requisições por minuto. O ``QuotaGovernor`` é um balde de fichas
+compartilhado pelo processo: cada requisição consome uma ficha e as fichas
+são repostas continuamente.
+
+Prioridades: chamadas da thread principal (a interface) são INTERACTIVE,
+as demais threads são BACKGROUND por padrão e a gravação remota de logs usa
+LOW. Uma chamada só pega ficha se não houver ninguém de prioridade maior
+esperando, e as prioridades menores deixam uma reserva para a interface.
+
+Uma thread que trabalha para a interface (por exemplo, a que carrega a
+tabela) usa ``with priority(INTERACTIVE):`` para ter a prioridade dela.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+INTERACTIVE = 0
+BACKGROUND = 1
+LOW = 2
+
+_local = threading.local()
+
+
+def current_priority():
+    """Prioridade padrão: a de ``priority`` nesta thread; senão interativa na interface, de fundo nas demais."""
+    level = getattr(_local, 'priority', None)
+    if level is not None:
+        return level
+    if threading.current_thread() is threading.main_thread():
+        return INTERACTIVE
+    return BACKGROUND
+
+
+@contextmanager
+def priority(level):
+    """Usa ``level`` como prioridade padrão das chamadas desta thread dentro do bloco."""
+    previous = getattr(_local, 'priority', None)
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+class QuotaGovernor:
+    def __init__(self, requests_per_minute=60, burst=10):
+        self.rate = requests_per_minute / 60.0  # fichas por segundo
+        self.capacity = burst
+        # Fichas que só a prioridade INTERACTIVE pode usar
+        self.reserve = {INTERACTIVE: 0, BACKGROUND: 2, LOW: 4}
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiting = defaultdict(int)  # prioridade -> chamadas aguardando
+        self._calls = defaultdict(deque)  # chamador -> instantes das chamadas no último minuto
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _can_take(self, priority):
+        if any(self._waiting[p] for p in range(priority)):
+            return False
+        return self._tokens - self.reserve.get(priority, 0) >= 1
+
+    def acquire(self, caller, priority=None, timeout=None):
+        """Aguarda uma ficha para ``caller``. Retorna False se ``timeout`` se esgotar antes."""
+        if priority is None:
+            priority = current_priority()
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._can_take(priority):
+                        self._tokens -= 1
+                        self._record_call(caller)
+                        return True
+                    missing = 1 + self.reserve.get(priority, 0) - self._tokens
+                    wait = max(missing / self.rate, 0.05)
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+                # Quem tem prioridade menor pode estar esperando só por esta chamada
+                self._cond.notify_all()
+
+    def _record_call(self, caller):
+        now = time.monotonic()
+        calls = self._calls[caller]
+        calls.append(now)
+        while calls and now - calls[0] > 60:
+            calls.popleft()
+
+    def calls_per_minute(self):
+        """Contadores ao vivo: {chamador: requisições nos últimos 60 segundos}."""
+        now = time.monotonic()
+        with self._cond:
+            for calls in self._calls.values():
+                while calls and now - calls[0] > 60:
+                    calls.popleft()
+            return {caller: len(calls) for caller, calls in self._calls.items() if calls}
+
+
+# Instância compartilhada pelo processo
+governor = QuotaGovernor()
+
+
+def acquire(caller, priority=None, timeout=None):
+    return governor.acquire(caller, priority=priority, timeout=timeout)
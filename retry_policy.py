@@ -0,0 +1,136 @@
+# retry_policy.py
+
+"""
+Política de novas tentativas para as chamadas à API do Google Sheets.
+
+Cada chamada tem um prazo total (``deadline``); só erros transitórios
+(cota 429, 5xx, timeout e falha de conexão) são repetidos, com espera
+exponencial e jitter. Erros permanentes sobem na hora. O disjuntor
+(``CircuitBreaker``) abre depois de falhas transitórias seguidas e faz as
+chamadas falharem imediatamente até o próximo teste, para que a interface
+continue com os dados em cache enquanto a API estiver instável. Cada
+tentativa consome uma ficha do ``quota_governor`` compartilhado.
+"""
+
+import functools
+import random
+import threading
+import time
+
+import gspread
+import requests
+
+import logger_app
+import quota_governor
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class SheetsUnavailableError(SystemError):
+    """A API não respondeu dentro do prazo ou o disjuntor está aberto."""
+
+
+def is_retryable(error):
+    if isinstance(error, gspread.exceptions.APIError):
+        response = getattr(error, 'response', None)
+        return getattr(response, 'status_code', None) in RETRYABLE_STATUS
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout  # segundos até permitir uma chamada de teste
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow(self):
+        """Indica se a chamada pode seguir; com o disjuntor aberto só passa uma chamada de teste por vez."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_running or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            was_open = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+        if was_open:
+            logger_app.log_info("API do Google Sheets respondeu novamente; disjuntor fechado")
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            opened = False
+            if self._trial_running or self._failures >= self.failure_threshold:
+                opened = self._opened_at is None
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+        if opened:
+            logger_app.log_warning("API do Google Sheets instável; usando dados em cache")
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=5, base_delay=0.5, max_delay=8.0, deadline=20.0,
+                 request_timeout=(5, 20), circuit_breaker=None, quota_caller=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline  # prazo total por chamada, em segundos
+        self.request_timeout = request_timeout  # (conexão, leitura) de cada requisição HTTP
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.quota_caller = quota_caller  # nome usado no quota_governor; None desativa o controle de cota
+
+    def backoff(self, attempt):
+        """Espera exponencial com jitter completo."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, func, *args, **kwargs):
+        name = getattr(func, '__name__', 'chamada')
+        if not self.circuit_breaker.allow():
+            raise SheetsUnavailableError(f"{name}: API do Google Sheets indisponível (disjuntor aberto)")
+
+        deadline = time.monotonic() + self.deadline
+        for attempt in range(self.max_attempts):
+            if self.quota_caller and not quota_governor.acquire(
+                    self.quota_caller, timeout=max(deadline - time.monotonic(), 0)):
+                raise SheetsUnavailableError(f"{name}: cota de requisições esgotada dentro do prazo")
+            try:
+                result = func(*args, **kwargs)
+            except SheetsUnavailableError:
+                # Chamada interna que já esgotou as tentativas e registrou a falha no disjuntor
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # A API respondeu; o erro é da requisição e não deve ser repetido
+                    self.circuit_breaker.record_success()
+                    raise
+                delay = self.backoff(attempt)
+                if attempt + 1 >= self.max_attempts or time.monotonic() + delay > deadline:
+                    self.circuit_breaker.record_failure()
+                    logger_app.log_error(f"{name} falhou após {attempt + 1} tentativa(s): {str(e)}")
+                    raise SheetsUnavailableError(f"{name}: {str(e)}") from e
+                time.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+
+def api_call(func):
+    """Decorador para métodos que usam ``self.retry_policy``."""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self.retry_policy.call(func, self, *args, **kwargs)
+    return wrapper
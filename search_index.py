@@ -0,0 +1,353 @@
+# search_index.py
+
+"""
+Índice invertido da busca de solicitações.
+
+Os textos das colunas pesquisáveis são normalizados (minúsculas e sem
+acentos, então 'João' e 'joao' são iguais) e quebrados em palavras. Cada
+palavra aponta para as linhas em que aparece, no geral e por coluna.
+
+Consultas:
+
+- cada termo é um prefixo de palavra: 'geo' encontra 'Geologia', mas
+  'ologia' não (a busca deixou de ser por trecho qualquer do texto)
+- em CPF e telefone vale qualquer trecho dos dígitos, com ou sem
+  pontuação: '12345678900' encontra '123.456.789-00' e '9876' encontra
+  '(19) 99876-5432'
+- vários termos precisam aparecer todos: 'maria geo'
+- ``campo:termo`` restringe o termo a uma coluna: 'curso:geologia',
+  'orientador:silva' (campos em ``FIELD_ALIASES``)
+
+Durante a digitação cada consulta costuma só estreitar a anterior ('mar' ->
+'mari' -> 'maria geo'); nesse caso o índice filtra o resultado anterior em
+vez de partir de todas as linhas.
+
+``TrigramIndex`` complementa a busca com nomes parecidos (solicitantes e
+orientadores) quando a consulta não encontra nada, para sugerir "Você quis
+dizer...".
+
+Os dois índices são atualizados por linha, de modo que o armazenamento pode
+mantê-los por versão dos dados só reindexando as linhas novas ou alteradas.
+"""
+
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+import heapq
+from collections import Counter
+
+# Campo usado na consulta (já normalizado) -> coluna dos dados
+FIELD_ALIASES = {
+    'id': 'Id',
+    'nome': 'Nome completo (sem abreviações):',
+    'orientador': 'Orientador',
+    'curso': 'Curso:',
+    'status': 'Status',
+    'valor': 'Valor',
+    'telefone': 'Telefone de contato:',
+    'email': 'Endereço de e-mail',
+    'cpf': 'CPF:',
+    'agencia': 'Qual a agência de fomento?',
+    'motivo': 'Motivo da solicitação',
+    'data': 'Carimbo de data/hora_str',
+    'atualizacao': 'Ultima Atualizacao_str',
+    'modificacao': 'Ultima modificação',
+}
+
+# Colunas numéricas em que a busca vale para qualquer trecho dos dígitos
+DIGIT_COLUMNS = {'CPF:', 'CPF_norm', 'Telefone de contato:'}
+MIN_DIGITS = 3  # trechos menores que isso só valem como início de palavra
+
+SEARCH_COLUMNS = list(dict.fromkeys(FIELD_ALIASES.values())) + ['CPF_norm']
+
+_TOKEN_PATTERN = re.compile(r'[0-9a-z]+')
+
+
+def fold(text):
+    """Minúsculas e sem acentos ('Solicitação' -> 'solicitacao')."""
+    decomposed = unicodedata.normalize('NFKD', str(text).lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    return _TOKEN_PATTERN.findall(fold(text))
+
+
+def digit_suffixes(text):
+    """Sufixos da sequência de dígitos de ``text``; como a busca é por prefixo, acham qualquer trecho."""
+    digits = ''.join(ch for ch in str(text) if ch.isdigit())
+    return [digits[i:] for i in range(len(digits) - MIN_DIGITS + 1)]
+
+
+def parse_query(query):
+    """Quebra a consulta em [(coluna ou None, prefixo)]; campos desconhecidos viram texto comum."""
+    terms = []
+    for part in str(query).split():
+        field, sep, value = part.partition(':')
+        column = FIELD_ALIASES.get(fold(field)) if sep else None
+        if column is None:
+            terms.extend((None, token) for token in tokenize(part))
+        else:
+            terms.extend((column, token) for token in tokenize(value))
+    return terms
+
+
+def refines(terms, previous):
+    """True se toda linha que atende a ``terms`` também atende a ``previous``.
+
+    Vale quando cada termo anterior tem um termo novo que o estende
+    ('mar' -> 'maria'), na mesma coluna ou a partir de um termo livre.
+    """
+    return all(any((prev_column is None or column == prev_column) and token.startswith(prev_token)
+                   for column, token in terms)
+               for prev_column, prev_token in previous)
+
+
+class _Postings:
+    """Palavra -> linhas, com o vocabulário ordenado para a busca por prefixo."""
+
+    def __init__(self):
+        self.rows = {}
+        self._vocabulary = []
+        self._sorted = True  # a ordenação é refeita só na próxima busca, não a cada palavra nova
+
+    def add(self, token, key):
+        if token not in self.rows:
+            self.rows[token] = set()
+            self._vocabulary.append(token)
+            self._sorted = False
+        self.rows[token].add(key)
+
+    def discard(self, token, key):
+        keys = self.rows.get(token)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self.rows[token]
+            vocabulary = self.vocabulary
+            del vocabulary[bisect_left(vocabulary, token)]
+
+    @property
+    def vocabulary(self):
+        if not self._sorted:
+            self._vocabulary.sort()
+            self._sorted = True
+        return self._vocabulary
+
+    def prefix(self, prefix):
+        vocabulary = self.vocabulary
+        found = set()
+        for i in range(bisect_left(vocabulary, prefix), len(vocabulary)):
+            token = vocabulary[i]
+            if not token.startswith(prefix):
+                break
+            found |= self.rows[token]
+        return found
+
+
+# Até quantas linhas o resultado anterior é filtrado linha a linha; acima disso, pelas listas de palavras
+ROW_CHECK_LIMIT = 2000
+
+
+class SearchIndex:
+    def __init__(self, columns=None):
+        self.columns = list(columns or SEARCH_COLUMNS)
+        self._all = _Postings()
+        self._by_column = {col: _Postings() for col in self.columns}
+        self._row_tokens = {}  # chave -> {coluna: palavras}, para reindexar a linha
+        self._last = None      # (termos, resultado) da última busca, para estreitá-la
+
+    def __len__(self):
+        return len(self._row_tokens)
+
+    def add_rows(self, df):
+        """Indexa (ou reindexa) as linhas de ``df``; o índice do DataFrame é a chave da linha."""
+        self._last = None
+        columns = [col for col in self.columns if col in df.columns]
+        known = {}  # (valor, numérica) -> palavras; status, cursos e orientadores se repetem muito
+        for key, values in zip(df.index, df[columns].itertuples(index=False, name=None)):
+            self.remove(key)
+            row_tokens = {}
+            for col, value in zip(columns, values):
+                text = '' if value is None or value != value else str(value)
+                digits = col in DIGIT_COLUMNS
+                tokens = known.get((text, digits))
+                if tokens is None:
+                    tokens = set(tokenize(text))
+                    if digits:
+                        tokens.update(digit_suffixes(text))
+                    tokens = known[(text, digits)] = frozenset(tokens)
+                for token in tokens:
+                    self._all.add(token, key)
+                    self._by_column[col].add(token, key)
+                row_tokens[col] = tokens
+            self._row_tokens[key] = row_tokens
+
+    def remove(self, key):
+        row_tokens = self._row_tokens.pop(key, None)
+        if row_tokens is None:
+            return
+        self._last = None
+        for col, tokens in row_tokens.items():
+            for token in tokens:
+                self._by_column[col].discard(token, key)
+        for token in set().union(*row_tokens.values()):
+            self._all.discard(token, key)
+
+    def search(self, query):
+        """Chaves das linhas que atendem a todos os termos de ``query``; None se não houver termos.
+
+        O conjunto retornado é compartilhado com a próxima busca e não deve ser alterado.
+        """
+        terms = parse_query(query)
+        if not terms:
+            return None
+        if self._last is not None and refines(terms, self._last[0]):
+            # Só os termos novos ou estendidos precisam ser conferidos no resultado anterior
+            previous_terms, previous = self._last
+            pending = [term for term in terms if term not in previous_terms]
+            if len(previous) <= ROW_CHECK_LIMIT:
+                result = {key for key in previous if self._row_matches(key, pending)}
+            elif len(pending) < len(terms):
+                result = self._match(pending, previous)
+            else:
+                # Todos os termos mudaram: o resultado anterior, grande, não poupa nada
+                result = self._match(terms)
+        else:
+            result = self._match(terms)
+        self._last = (terms, result)
+        return result
+
+    def _match(self, terms, result=None):
+        # Termos mais longos costumam ser mais seletivos; começar por eles reduz as interseções
+        for column, prefix in sorted(terms, key=lambda term: -len(term[1])):
+            postings = self._all if column is None else self._by_column.get(column)
+            found = postings.prefix(prefix) if postings is not None else set()
+            result = found if result is None else result & found
+            if not result:
+                return set()
+        return set() if result is None else result
+
+    def _row_matches(self, key, terms):
+        row_tokens = self._row_tokens.get(key, {})
+        for column, prefix in terms:
+            if column is None:
+                tokens = (token for col_tokens in row_tokens.values() for token in col_tokens)
+            else:
+                tokens = row_tokens.get(column, ())
+            if not any(token.startswith(prefix) for token in tokens):
+                return False
+        return True
+
+
+# ----------------------------------------------------------------------
+# Busca aproximada de nomes
+# ----------------------------------------------------------------------
+NAME_COLUMNS = ['Nome completo (sem abreviações):', 'Orientador']
+
+
+def trigrams(text):
+    """Trigramas das palavras normalizadas, com bordas marcadas ('  jo', ' jo', 'joa', ...)."""
+    grams = set()
+    for word in tokenize(text):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Nomes de solicitantes e orientadores por trigramas, tolerante a acentos e erros de digitação.
+
+    A semelhança é a fração dos trigramas da consulta presentes no nome (o
+    nome pode ter mais palavras que a consulta); empates são desfeitos pela
+    semelhança de Jaccard, que favorece os nomes mais próximos do todo.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = list(columns or NAME_COLUMNS)
+        # Cada nome distinto (coluna, nome normalizado) recebe um número; os trigramas apontam para ele
+        self._ids = {}        # (coluna, nome normalizado) -> número
+        self._entries = {}    # número -> (nome exibido, coluna, trigramas, chaves das linhas)
+        self._grams = {}      # trigrama -> {número}
+        self._row_names = {}  # chave da linha -> [número]
+        self._next_id = 0
+
+    def add_rows(self, df):
+        """Indexa (ou reindexa) os nomes das linhas de ``df``."""
+        columns = [col for col in self.columns if col in df.columns]
+        for key, values in zip(df.index, df[columns].itertuples(index=False, name=None)):
+            self.remove(key)
+            ids = []
+            for col, value in zip(columns, values):
+                if value is None or value != value:
+                    continue
+                display = ' '.join(str(value).split())
+                name = ' '.join(tokenize(display))
+                if not name:
+                    continue
+                entry_id = self._ids.get((col, name))
+                if entry_id is None:
+                    entry_id = self._ids[(col, name)] = self._next_id
+                    self._next_id += 1
+                    grams = trigrams(name)
+                    self._entries[entry_id] = (display, col, grams, set())
+                    for gram in grams:
+                        self._grams.setdefault(gram, set()).add(entry_id)
+                self._entries[entry_id][3].add(key)
+                ids.append(entry_id)
+            self._row_names[key] = ids
+
+    def remove(self, key):
+        for entry_id in self._row_names.pop(key, ()):
+            display, col, grams, keys = self._entries[entry_id]
+            keys.discard(key)
+            if keys:
+                continue
+            del self._entries[entry_id]
+            del self._ids[(col, ' '.join(tokenize(display)))]  # mesmo nome normalizado de add_rows
+            for gram in grams:
+                ids = self._grams[gram]
+                ids.discard(entry_id)
+                if not ids:
+                    del self._grams[gram]
+
+    def lookup(self, text, columns=None, limit=10, min_similarity=0.4):
+        """Nomes parecidos com ``text``, do mais ao menos parecido.
+
+        Retorna [(nome, coluna, semelhança, chaves das linhas)].
+        """
+        query = trigrams(text)
+        if not query:
+            return []
+        needed = max(1, math.ceil(min_similarity * len(query)))
+        # Um nome com t trigramas em comum tem pelo menos um dos len(query) - t + 1 mais raros.
+        # Descendo t a partir do total, cada passo só conta os nomes de mais uma lista de
+        # trigramas; quando já há ``limit`` nomes com t ou mais, os melhores estão entre eles e
+        # os trigramas comuns ('  m', 'san'...) nem chegam a gerar candidatos.
+        postings = sorted((self._grams.get(gram, set()) for gram in query), key=len)
+        shared = {}              # número -> trigramas em comum
+        with_count = Counter()   # trigramas em comum -> quantos nomes
+        threshold = needed
+        for i, ids in enumerate(postings[:len(query) - needed + 1]):
+            new = ids - shared.keys()
+            if columns:
+                new = {entry_id for entry_id in new if self._entries[entry_id][1] in columns}
+            # Contagem feita pelo Counter e pelas interseções de conjuntos (em C), sem laço por trigrama
+            counts = Counter()
+            for other in postings[i:]:
+                counts.update(new & other)
+            shared.update(counts)
+            with_count.update(counts.values())
+            threshold = len(query) - i
+            if sum(n for count, n in with_count.items() if count >= threshold) >= limit:
+                break
+        threshold = max(threshold, needed)
+        candidates = [(count, entry_id) for entry_id, count in shared.items() if count >= threshold]
+
+        # Mais trigramas em comum primeiro; entre iguais, o nome mais curto (maior Jaccard)
+        best = heapq.nsmallest(limit, candidates, key=lambda c: (-c[0], len(self._entries[c[1]][2]),
+                                                                   self._entries[c[1]][:2]))
+        return [(self._entries[entry_id][0], self._entries[entry_id][1], count / len(query),
+                 set(self._entries[entry_id][3])) for count, entry_id in best]
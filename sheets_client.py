@@ -0,0 +1,63 @@
+# sheets_client.py
+
+"""
+Fábrica única do cliente gspread do aplicativo.
+
+A autorização com a conta de serviço é feita uma vez por arquivo de
+credenciais e o mesmo cliente (e sua sessão HTTP com conexões reaproveitadas)
+atende o GoogleSheetsHandler, o logger e o MachineManager. As planilhas e
+abas abertas ficam guardadas, evitando novas leituras de metadados.
+"""
+
+import threading
+
+import gspread
+
+from constants import CREDENTIALS_FILE, GOOGLE_SHEETS_SCOPE
+
+_lock = threading.Lock()
+_key_locks = {}     # chave -> Lock, para que aberturas diferentes corram em paralelo
+_clients = {}       # arquivo de credenciais -> gspread.Client
+_spreadsheets = {}  # (credenciais, url) -> Spreadsheet
+_worksheets = {}    # (credenciais, url, aba) -> Worksheet
+
+
+def _cached(cache, key, factory):
+    """Cria o objeto uma única vez por chave; chaves diferentes não esperam umas pelas outras."""
+    with _lock:
+        if key in cache:
+            return cache[key]
+        key_lock = _key_locks.setdefault((id(cache), key), threading.Lock())
+    with key_lock:
+        if key not in cache:
+            cache[key] = factory()
+        return cache[key]
+
+
+def get_client(credentials_file=CREDENTIALS_FILE):
+    """Retorna o cliente autorizado; o token é renovado automaticamente pela sessão."""
+    return _cached(_clients, credentials_file, lambda: gspread.service_account(
+        filename=credentials_file, scopes=GOOGLE_SHEETS_SCOPE
+    ))
+
+
+def open_spreadsheet(url, credentials_file=CREDENTIALS_FILE):
+    return _cached(_spreadsheets, (credentials_file, url),
+                   lambda: get_client(credentials_file).open_by_url(url))
+
+
+def get_worksheet(url, title, credentials_file=CREDENTIALS_FILE, header=None, rows=1000, cols=10):
+    """Retorna a aba ``title``. Se ela não existir e ``header`` for informado, cria a aba com esse cabeçalho."""
+    def open_worksheet():
+        spreadsheet = open_spreadsheet(url, credentials_file)
+        try:
+            return spreadsheet.worksheet(title)
+        except gspread.exceptions.WorksheetNotFound:
+            if header is None:
+                raise
+            worksheet = spreadsheet.add_worksheet(title=title, rows=str(rows), cols=str(cols))
+            worksheet.append_row(header)
+            return worksheet
+
+    return _cached(_worksheets, (credentials_file, url, title), open_worksheet)
+
@@ -0,0 +1,191 @@
+# sqlite_backend.py
+
+"""
+Armazenamento local das solicitações em SQLite, com a mesma interface do
+GoogleSheetsHandler. Serve para trabalhar offline, com históricos grandes e
+para medir a interface e as estatísticas sem a latência da rede.
+
+A tabela ``requests`` tem uma coluna por cabeçalho da planilha (sem tipo
+declarado, para manter números e textos como vieram) e ``row_id`` na ordem
+original das linhas. O índice do DataFrame é ``row_id - 1``, como na
+planilha. Os e-mails de notificação ficam em ``notification_emails``.
+"""
+
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from storage_backend import StorageBackend
+import logger_app
+
+
+def default_database_path():
+    base_dir = os.getenv('APPDATA') or os.path.expanduser('~')
+    return os.path.join(base_dir, 'Financas-IG', 'data', 'requests.sqlite')
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class SQLiteBackend(StorageBackend):
+    def __init__(self, database_path=None):
+        super().__init__()
+        self.database_path = database_path or default_database_path()
+        os.makedirs(os.path.dirname(self.database_path) or '.', exist_ok=True)
+
+        # Uma conexão para o processo; o lock serializa o uso entre threads
+        self._conn = sqlite3.connect(self.database_path, check_same_thread=False)
+        self._conn_lock = threading.Lock()
+        with self._conn_lock:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS requests (row_id INTEGER PRIMARY KEY)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS notification_emails (status TEXT PRIMARY KEY, emails TEXT)"
+            )
+            self._conn.commit()
+        self._data_cache = None
+
+    @property
+    def column_names(self):
+        with self._conn_lock:
+            info = self._conn.execute("PRAGMA table_info(requests)").fetchall()
+        return [row[1] for row in info if row[1] != 'row_id']
+
+    def load_data(self, force=False, columns=None):
+        """Retorna uma cópia dos dados; o banco só é lido de novo após alterações ou com ``force``."""
+        with self._data_lock:
+            if force or self._data_cache is None:
+                self.refresh()
+            df = self._data_cache
+            if columns is not None:
+                df = df.reindex(columns=[col for col in columns if col in df.columns])
+            return df.copy()
+
+    def get_row(self, key):
+        """Uma linha do cache, sem copiar a tabela inteira."""
+        with self._data_lock:
+            if self._data_cache is None:
+                self.refresh()
+            if key not in self._data_cache.index:
+                return None
+            return self._data_cache.loc[key].copy()
+
+    def refresh(self):
+        with self._data_lock:
+            with self._conn_lock:
+                df = pd.read_sql_query("SELECT * FROM requests ORDER BY row_id", self._conn)
+            df.index = df.pop('row_id') - 1
+            df.index.name = None
+            previous, self._data_cache = self._data_cache, df
+            if previous is None or not previous.equals(df):
+                self._bump_version(full=True)
+            return self.data_version
+
+    def _locate_row(self, key):
+        with self._conn_lock:
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(requests)").fetchall()]
+            conditions = [f"CAST({_quote(col)} AS TEXT) = ?" for col in ('Carimbo de data/hora', 'Id')
+                          if col in columns]
+            if not conditions:
+                return None
+            row = self._conn.execute(
+                f"SELECT row_id FROM requests WHERE {' OR '.join(conditions)} ORDER BY row_id LIMIT 1",
+                [str(key)] * len(conditions)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _queue_write(self, key, row, changes):
+        changes = {col: value for col, value in changes.items() if col in self.column_names}
+        if not changes:
+            return
+        assignments = ", ".join(f"{_quote(col)} = ?" for col in changes)
+        try:
+            with self._data_lock:
+                with self._conn_lock:
+                    self._conn.execute(
+                        f"UPDATE requests SET {assignments} WHERE row_id = ?",
+                        list(changes.values()) + [row]
+                    )
+                    self._conn.commit()
+                # O cache recebe a alteração na própria linha; os índices só reposicionam essa linha
+                idx = row - 1
+                if self._data_cache is not None and idx in self._data_cache.index:
+                    for column_name, value in changes.items():
+                        try:
+                            self._data_cache.at[idx, column_name] = value
+                        except (TypeError, ValueError):
+                            # Tipo da coluna não comporta o valor (ex.: número numa coluna de texto)
+                            self._data_cache[column_name] = self._data_cache[column_name].astype(object)
+                            self._data_cache.at[idx, column_name] = value
+                    self._bump_version(modified=[idx])
+        except Exception as e:
+            logger_app.log_error(f"Erro ao gravar no banco local: {str(e)}")
+
+    def _cached_value(self, row, column_name, default=''):
+        if column_name not in self.column_names:
+            return default
+        with self._conn_lock:
+            result = self._conn.execute(
+                f"SELECT {_quote(column_name)} FROM requests WHERE row_id = ?", (row,)
+            ).fetchone()
+        return default if result is None or result[0] is None else result[0]
+
+    def get_notification_emails(self):
+        """Retorna os emails de notificação por status."""
+        try:
+            with self._conn_lock:
+                rows = self._conn.execute("SELECT status, emails FROM notification_emails").fetchall()
+            emails_dict = {}
+            for status, email_str in rows:
+                emails = [e.strip() for e in str(email_str or '').split(",") if e.strip()]
+                if emails:
+                    emails_dict[status] = emails
+            return emails_dict
+        except Exception as e:
+            logger_app.log_error(f"Erro ao obter emails de notificação: {str(e)}")
+            return {}
+
+    def update_notification_emails(self, column, emails):
+        """Atualiza os emails de notificação para um status específico"""
+        try:
+            with self._conn_lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO notification_emails (status, emails) VALUES (?, ?)",
+                    (column, ", ".join(emails))
+                )
+                self._conn.commit()
+            return True
+        except Exception as e:
+            logger_app.log_error(f"Erro ao atualizar emails de notificação: {str(e)}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Importação
+    # ------------------------------------------------------------------
+    def import_dataframe(self, df, notification_emails=None):
+        """Substitui o conteúdo do banco por ``df`` (na ordem das linhas) e pelos emails informados."""
+        columns = [str(col) for col in df.columns]
+        column_defs = "".join(f", {_quote(col)}" for col in columns)
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        rows = [[i + 1] + values for i, values in enumerate(df.astype(object).values.tolist())]
+
+        with self._data_lock:
+            with self._conn_lock:
+                self._conn.execute("DROP TABLE IF EXISTS requests")
+                self._conn.execute(f"CREATE TABLE requests (row_id INTEGER PRIMARY KEY{column_defs})")
+                self._conn.executemany(f"INSERT INTO requests VALUES ({placeholders})", rows)
+                if notification_emails is not None:
+                    self._conn.execute("DELETE FROM notification_emails")
+                    self._conn.executemany(
+                        "INSERT INTO notification_emails (status, emails) VALUES (?, ?)",
+                        [(status, ", ".join(emails)) for status, emails in notification_emails.items()]
+                    )
+                self._conn.commit()
+            self._data_cache = None
+
+    def import_from(self, backend):
+        """Copia todas as colunas e os emails de outro armazenamento (por exemplo, a planilha)."""
+        df = backend.load_data(force=True, columns=backend.column_names)
+        self.import_dataframe(df, backend.get_notification_emails())
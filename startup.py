@@ -0,0 +1,66 @@
+# startup.py
+
+"""
+Etapas de rede da abertura do aplicativo, executadas em paralelo.
+
+Enquanto o usuário digita login e senha, um pool de threads já verifica a
+autorização da máquina (aba 'Serial'), abre a planilha de solicitações,
+carrega os dados e os e-mails de notificação. O login e o ``App`` só
+aguardam o resultado de que precisam, de modo que o tempo até a primeira
+tabela fica limitado à chamada mais lenta, e não à soma de todas.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import CREDENTIALS_FILE
+from google_sheets_handler import GoogleSheetsHandler
+from machine_manager import MachineManager
+import logger_app
+
+
+class StartupPrefetch:
+    def __init__(self, sheet_url=None, credentials_file=CREDENTIALS_FILE, handler_factory=None):
+        """``handler_factory`` cria o armazenamento; sem ele, usa o GoogleSheetsHandler de ``sheet_url``."""
+        self.credentials_file = credentials_file
+        self.sheet_url = sheet_url
+        self.handler_factory = handler_factory or self._open_sheets_handler
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='startup')
+
+        self.machine_authorized = self._executor.submit(self._check_machine)
+        self.handler = self._executor.submit(self.handler_factory)
+        # Dados e e-mails seguem em paralelo assim que o armazenamento estiver aberto
+        self.data = self._executor.submit(self._after_handler, lambda handler: handler.load_data())
+        self.notification_emails = self._executor.submit(
+            self._after_handler, lambda handler: handler.get_notification_emails()
+        )
+        self._executor.shutdown(wait=False)
+
+    def _open_sheets_handler(self):
+        return GoogleSheetsHandler(self.credentials_file, self.sheet_url)
+
+    def _check_machine(self):
+        return MachineManager(self.credentials_file).is_machine_authorized()
+
+    def _after_handler(self, step):
+        return step(self.handler.result())
+
+    def is_machine_authorized(self, is_admin_a5=False):
+        """Resultado da verificação feita em segundo plano (administradores A5 não dependem dela)."""
+        if is_admin_a5:
+            return True
+        try:
+            return self.machine_authorized.result()
+        except Exception as e:
+            logger_app.log_error(f"Erro ao verificar autorização: {str(e)}")
+            return False
+
+    def get_handler(self):
+        """Aguarda o armazenamento aberto (e a primeira carga de dados) e o retorna."""
+        handler = self.handler.result()
+        for future in (self.data, self.notification_emails):
+            try:
+                future.result()
+            except Exception as e:
+                # A tela inicial tenta de novo pelo caminho normal
+                logger_app.log_error(f"Erro ao pré-carregar dados: {str(e)}")
+        return handler
@@ -0,0 +1,454 @@
+# storage_backend.py
+
+"""
+Interface comum das fontes de dados das solicitações.
+
+O aplicativo (tabela, detalhes, estatísticas e configurações) conversa só
+com os métodos desta classe; ``GoogleSheetsHandler`` e ``SQLiteBackend`` são
+as implementações. A base concentra o que não depende do armazenamento:
+tipagem por versão dos dados, avisos de recarga e as regras de cada
+alteração (status, valor, autor e data da última atualização).
+
+Uma implementação precisa fornecer (métodos abstratos; sem eles a classe
+não pode ser instanciada):
+
+- ``load_data(force=False, columns=None)`` e ``refresh()``
+- ``column_names``
+- ``_locate_row(key)``: linha da solicitação pelo carimbo de data/hora ou Id
+- ``_queue_write(key, row, changes)``: grava {coluna: valor} na linha
+- ``_cached_value(row, column, default='')``
+- ``get_notification_emails()`` e ``update_notification_emails(column, emails)``
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import datetime
+
+from data_ingestion import build_typed_frame, default_order_keys
+from search_index import NAME_COLUMNS, SearchIndex, TrigramIndex, parse_query
+import logger_app
+
+
+class StorageBackend(ABC):
+    def __init__(self):
+        self._data_lock = threading.RLock()
+        self.data_version = 0
+        self._typed_cache = None  # (data_version, DataFrame tipado)
+        # Índices derivados dos dados tipados: nome -> (data_version, índice); ver _derived_index
+        self._derived = {}
+        self._derived_build_locks = {}  # nome -> Lock, para não construir o mesmo índice duas vezes
+        self._last_money_report = {}
+        self._data_listeners = []
+        self._background_refresh = None
+        # Última mudança detectada: {'version', 'added': [índices], 'modified': [índices], 'full': bool}
+        self.last_changes = None
+        self._change_log = deque(maxlen=50)  # últimas mudanças, para atualizações por diferença
+
+        # Verificação periódica de novas respostas do formulário
+        self.poll_min_interval = 15   # segundos
+        self.poll_max_interval = 120  # segundos
+        self._poller = None
+        self._poll_stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Operações que cada armazenamento implementa
+    # ------------------------------------------------------------------
+    @abstractmethod
+    def load_data(self, force=False, columns=None):
+        pass
+
+    @abstractmethod
+    def refresh(self):
+        """Sincroniza com o armazenamento e retorna a nova ``data_version``."""
+
+    @property
+    @abstractmethod
+    def column_names(self):
+        pass
+
+    @abstractmethod
+    def _locate_row(self, key):
+        pass
+
+    @abstractmethod
+    def _queue_write(self, key, row, changes):
+        pass
+
+    @abstractmethod
+    def _cached_value(self, row, column_name, default=''):
+        pass
+
+    @abstractmethod
+    def get_notification_emails(self):
+        pass
+
+    @abstractmethod
+    def update_notification_emails(self, column, emails):
+        pass
+
+    # ------------------------------------------------------------------
+    # Comportamento padrão, sobrescrito quando o armazenamento precisa
+    # ------------------------------------------------------------------
+    @property
+    def pending_writes(self):
+        return 0
+
+    def flush(self, timeout=None):
+        return True
+
+    @property
+    def api_degraded(self):
+        return False
+
+    def load_row_details(self, row_data):
+        return row_data
+
+    def get_row(self, key):
+        """Uma solicitação completa pela chave da tabela (o índice no DataFrame), ou None."""
+        data = self.load_data()
+        if key not in data.index:
+            return None
+        return self.load_row_details(data.loc[key])
+
+    # ------------------------------------------------------------------
+    # Dados tipados e avisos de recarga
+    # ------------------------------------------------------------------
+    def load_typed_data(self, force=False):
+        """Retorna os dados com as colunas tipadas de ``data_ingestion``.
+
+        A conversão é feita uma vez por ``data_version`` e reaproveitada pela
+        tabela, pelo histórico e pelas estatísticas.
+        """
+        return self._typed_frame(force)[1].copy()
+
+    def _typed_frame(self, force=False):
+        """(data_version, frame tipado) da versão atual, sem cópia; só para uso interno.
+
+        A leitura dos dados (que pode acessar a rede) e a tipagem acontecem sem
+        ``_data_lock``; o lock só protege a consulta e a troca do cache.
+        """
+        if force:
+            self.load_data(force=True)
+        while True:
+            with self._data_lock:
+                version = self.data_version
+                if self._typed_cache is not None and self._typed_cache[0] == version:
+                    return self._typed_cache
+            df = self.load_data()
+            typed = build_typed_frame(df)
+            with self._data_lock:
+                # Uma recarga durante a leitura invalida o resultado; tenta de novo com os dados novos
+                if self.data_version != version:
+                    continue
+                self._typed_cache = (version, typed)
+            self._report_money_parse_failures(typed.attrs['money_parse_report'])
+            return version, typed
+
+    def _derived_index(self, name, build, update, use):
+        """Retorna ``use(índice)`` para o índice ``name`` na versão atual dos dados.
+
+        Na primeira vez (ou após uma recarga completa) chama ``build(typed)``
+        sem ``_data_lock``, com o frame tipado daquela versão, e só troca o
+        índice com o lock; quem usa outros índices ou o cache não espera pela
+        construção. Depois, ``update(index, typed, chaves)`` só com as linhas
+        novas ou alteradas desde a versão do índice. ``use`` roda com o lock,
+        já que as atualizações incrementais alteram o índice no lugar.
+        """
+        while True:
+            version, typed = self._typed_frame()
+            with self._data_lock:
+                if self.data_version != version:
+                    continue
+                current = self._derived.get(name)
+                changes = None
+                if current is not None and current[0] != version:
+                    changes = self.changes_since(current[0])
+                if current is not None and (current[0] == version or changes is not None):
+                    if current[0] != version:
+                        update(current[1], typed, typed.index.intersection(changes[0] + changes[1]))
+                        self._derived[name] = (version, current[1])
+                    return use(current[1])
+                build_lock = self._derived_build_locks.setdefault(name, threading.Lock())
+
+            # Uma construção por índice de cada vez; quem chega depois aproveita o resultado
+            with build_lock:
+                with self._data_lock:
+                    current = self._derived.get(name)
+                    if current is not None and current[0] >= version:
+                        continue
+                index = build(typed)
+                with self._data_lock:
+                    current = self._derived.get(name)
+                    # Se os dados mudaram durante a construção, a próxima volta aplica as diferenças
+                    if current is None or current[0] < version:
+                        self._derived[name] = (version, index)
+
+    def _status_index(self, use):
+        def build(typed):
+            index = {'by_status': {}, 'all': [], 'entries': {}}
+            self._index_rows(index, typed, typed.index)
+            return index
+
+        return self._derived_index('status', build, self._index_rows, use)
+
+    def status_index(self, status=None):
+        """Chaves das linhas com ``status`` (todas, se None), já na ordem padrão das tabelas.
+
+        O índice acompanha ``data_version``: mudanças incrementais só
+        reposicionam as linhas novas ou alteradas, e recargas completas o
+        reconstroem. Não acessa a rede além do que ``load_data`` já faria.
+        """
+        def use(index):
+            orders = index['all'] if status is None else index['by_status'].get(status, [])
+            return [order[-1] for order in orders]
+
+        return self._status_index(use)
+
+    def search(self, query):
+        """Chaves das linhas que atendem à busca ``query`` (sintaxe em ``search_index``).
+
+        Retorna None para uma consulta sem termos. O índice invertido é mantido
+        por versão dos dados, reindexando só as linhas novas ou alteradas, e
+        uma consulta que só estreita a anterior filtra o resultado anterior.
+        """
+        def build(typed):
+            index = SearchIndex()
+            index.add_rows(typed)
+            return index
+
+        def update(index, typed, keys):
+            index.add_rows(typed.loc[keys])
+
+        return self._derived_index('search', build, update, lambda index: index.search(query))
+
+    def similar_names(self, query, limit=5):
+        """Nomes de solicitantes e orientadores parecidos com a busca, para o "Você quis dizer".
+
+        Considera os termos livres e os de ``nome:``/``orientador:``. Retorna
+        [(nome, coluna, semelhança, chaves das linhas)], do mais parecido ao menos.
+        """
+        terms = parse_query(query)
+        columns = {column for column, _ in terms if column in NAME_COLUMNS}
+        text = ' '.join(token for column, token in terms if column is None or column in NAME_COLUMNS)
+
+        def build(typed):
+            index = TrigramIndex()
+            index.add_rows(typed)
+            return index
+
+        def update(index, typed, keys):
+            index.add_rows(typed.loc[keys])
+
+        return self._derived_index(
+            'names', build, update, lambda index: index.lookup(text, columns=columns or None, limit=limit)
+        )
+
+    def status_counts(self):
+        """Quantidade de solicitações por status, a partir do índice de status."""
+        return self._status_index(
+            lambda index: {status: len(orders) for status, orders in index['by_status'].items()}
+        )
+
+    @staticmethod
+    def _index_rows(index, typed, keys):
+        """(Re)posiciona ``keys`` nas listas ordenadas do índice de status."""
+        subset = typed.loc[keys]
+        orders = default_order_keys(subset)
+        statuses = subset['Status'].astype(str) if 'Status' in subset.columns else None
+        for key in keys:
+            previous = index['entries'].get(key)
+            if previous is not None:
+                for orders_list in (index['by_status'][previous[0]], index['all']):
+                    del orders_list[bisect_left(orders_list, previous[1])]
+            status = '' if statuses is None else statuses[key]
+            insort(index['by_status'].setdefault(status, []), orders[key])
+            insort(index['all'], orders[key])
+            index['entries'][key] = (status, orders[key])
+
+    @property
+    def money_parse_report(self):
+        """Valores monetários que não puderam ser lidos na última tipagem: {coluna: {linha: valor}}."""
+        with self._data_lock:
+            if self._typed_cache is None:
+                return {}
+            return self._typed_cache[1].attrs['money_parse_report']
+
+    def _report_money_parse_failures(self, report):
+        # Registra só quando o conjunto de falhas muda, para não repetir o log a cada versão
+        if report == self._last_money_report:
+            return
+        self._last_money_report = report
+        for col, failures in report.items():
+            rows = ", ".join(f"linha {idx + 2}: {value!r}" for idx, value in list(failures.items())[:20])
+            logger_app.log_error(f"{len(failures)} valor(es) não reconhecido(s) em '{col}' ({rows})")
+
+    def _bump_version(self, added=(), modified=(), full=False):
+        """Registra uma nova versão dos dados com as linhas novas e alteradas (chamar com ``_data_lock``)."""
+        self.data_version += 1
+        self.last_changes = {'version': self.data_version, 'added': list(added),
+                             'modified': list(modified), 'full': full}
+        self._change_log.append(self.last_changes)
+        return self.data_version
+
+    def changes_since(self, version):
+        """Linhas novas e alteradas desde ``version``: (added, modified).
+
+        Retorna None quando não dá para saber só pelas diferenças (recarga
+        completa no meio do caminho ou histórico insuficiente); nesse caso
+        quem usa os dados deve recarregar tudo.
+        """
+        with self._data_lock:
+            if version == self.data_version:
+                return [], []
+            entries = [c for c in self._change_log if c['version'] > version]
+            if len(entries) != self.data_version - version or any(c['full'] for c in entries):
+                return None
+            added, modified = set(), set()
+            for change in entries:
+                added.update(change['added'])
+                modified.update(change['modified'])
+            return sorted(added), sorted(modified - added)
+
+    def add_data_listener(self, callback):
+        """Registra ``callback(data_version)``, chamado após recargas feitas em segundo plano.
+
+        O callback roda na thread de recarga; a interface deve repassá-lo à thread do Tk.
+        """
+        self._data_listeners.append(callback)
+
+    def refresh_in_background(self):
+        """Recarrega os dados numa thread separada e avisa os listeners ao terminar."""
+        if self._background_refresh is not None and self._background_refresh.is_alive():
+            return
+        self._background_refresh = threading.Thread(target=self._refresh_and_notify, daemon=True)
+        self._background_refresh.start()
+
+    def _refresh_and_notify(self):
+        try:
+            version = self.refresh()
+        except Exception as e:
+            logger_app.log_error(f"Erro ao atualizar dados em segundo plano: {str(e)}")
+            return
+        self._notify_listeners(version)
+
+    def _notify_listeners(self, version):
+        for callback in list(self._data_listeners):
+            try:
+                callback(version)
+            except Exception as e:
+                logger_app.log_error(f"Erro ao notificar atualização de dados: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Verificação periódica
+    # ------------------------------------------------------------------
+    @property
+    def polling_active(self):
+        return self._poller is not None and self._poller.is_alive()
+
+    def start_polling(self):
+        """Passa a sincronizar em segundo plano e a avisar os listeners quando algo muda.
+
+        O intervalo começa em ``poll_min_interval``, cresce 50% a cada
+        verificação sem novidades até ``poll_max_interval`` e volta ao mínimo
+        quando uma mudança é encontrada. Em caso de erro, espera o máximo.
+        """
+        if self.polling_active:
+            return
+        self._poll_stop.clear()
+        self._poller = threading.Thread(target=self._poll_loop, daemon=True)
+        self._poller.start()
+
+    def stop_polling(self):
+        self._poll_stop.set()
+
+    def _poll_loop(self):
+        interval = self.poll_min_interval
+        while not self._poll_stop.wait(interval):
+            before = self.data_version
+            try:
+                version = self.refresh()
+            except Exception as e:
+                logger_app.log_error(f"Erro ao verificar novas solicitações: {str(e)}")
+                interval = self.poll_max_interval
+                continue
+            if version != before:
+                self._notify_listeners(version)
+                interval = self.poll_min_interval
+            else:
+                interval = min(self.poll_max_interval, interval * 1.5)
+
+    # ------------------------------------------------------------------
+    # Alterações
+    # ------------------------------------------------------------------
+    def transition(self, timestamp_value, new_status=None, new_value=None, user_name=None):
+        """Registra status, valor, data da última atualização e autor de uma solicitação.
+
+        Todas as colunas alteradas seguem juntas numa única gravação.
+        """
+        row = self._locate_row(timestamp_value)
+        if row is None:
+            return False
+
+        changes = {}
+        if new_status is not None:
+            changes['Status'] = new_status
+        if new_value is not None:
+            changes['Valor'] = new_value
+        # Formato modificado para DD-MM-YYYY HH:mm:ss
+        changes['Ultima Atualizacao'] = datetime.now().strftime('%d-%m-%Y %H:%M:%S')
+        if user_name and 'Ultima modificação' in self.column_names:
+            changes['Ultima modificação'] = user_name
+
+        # O ID vem da linha em cache, sem nova leitura
+        id_value = self._cached_value(row, 'Id')
+        self._queue_write(timestamp_value, row, changes)
+
+        details = []
+        if new_status is not None:
+            details.append(f"Status alterado para {new_status}")
+        if new_value is not None:
+            details.append(f"Valor alterado para {new_value}")
+        logger_app.log_data_change(
+            user=user_name or "SYSTEM",
+            action="UPDATE_STATUS" if new_status is not None else "UPDATE_VALUE",
+            details=f"{', '.join(details)}, ID={id_value}, timestamp={timestamp_value}"
+        )
+        return True
+
+    def update_status(self, timestamp_value, new_status, user_name=None):
+        return self.transition(timestamp_value, new_status=new_status, user_name=user_name)
+
+    def update_value(self, timestamp_value, new_value, user_name=None):
+        return self.transition(timestamp_value, new_value=new_value, user_name=user_name)
+
+    def update_cell(self, timestamp_value, column_name, new_value):
+        if column_name not in self.column_names:
+            return False
+        row = self._locate_row(timestamp_value)
+        if row is None:
+            return False
+
+        self._queue_write(timestamp_value, row, {column_name: new_value})
+        return True
+
+    def update_observations(self, timestamp_value, observations):
+        """Atualiza as observações de uma solicitação específica."""
+        try:
+            if 'Observações' not in self.column_names:
+                return False
+            row = self._locate_row(timestamp_value)
+            if row is None:
+                return False
+
+            self._queue_write(timestamp_value, row, {'Observações': observations})
+            logger_app.log_data_change(
+                user="SYSTEM",
+                action="UPDATE_OBSERVATIONS",
+                details=f"Observações atualizadas para timestamp={timestamp_value}"
+            )
+            return True
+        except Exception as e:
+            logger_app.log_error(f"Erro ao atualizar observações: {e}")
+            return False
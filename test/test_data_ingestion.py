@@ -0,0 +1,39 @@
+import unittest
+import pandas as pd
+from data_ingestion import parse_money_cents, build_typed_frame, sort_rows
+
+class TestMoneyParsing(unittest.TestCase):
+    def test_formatos_brasileiros(self):
+        valores = pd.Series(['R$ 1.234,56', '1234', 1234, '1.234', '12.50', 'R$1,5', '-3,00', ''], dtype=object)
+        cents, failed = parse_money_cents(valores)
+        self.assertEqual(cents.tolist(), [123456, 123400, 123400, 123400, 1250, 150, -300, 0])
+        self.assertFalse(failed.any())
+
+    def test_valor_invalido_entra_no_relatorio(self):
+        df = pd.DataFrame({'Valor': ['R$ 10,00', 'abc'], 'Status': ['Pago', 'Pago']})
+        typed = build_typed_frame(df)
+        self.assertEqual(typed['Valor_cents'].tolist(), [1000, 0])
+        self.assertEqual(typed.attrs['money_parse_report'], {'Valor': {1: 'abc'}})
+class TestSortRows(unittest.TestCase):
+    def setUp(self):
+        self.typed = build_typed_frame(pd.DataFrame({
+            'Carimbo de data/hora': ['02/01/2025 10:00:00', '', '01/01/2025 10:00:00', '02/01/2025 10:00:00', ''],
+            'Status': ['Pago', 'Pago', '', 'pago', None],
+        }, index=[10, 11, 12, 13, 14]))
+
+    def test_data_ausente_no_comeco_da_crescente_e_no_fim_da_decrescente(self):
+        self.assertEqual(sort_rows(self.typed, 'Carimbo de data/hora').tolist(), [11, 14, 12, 10, 13])
+        self.assertEqual(sort_rows(self.typed, 'Carimbo de data/hora', ascending=False).tolist(), [10, 13, 12, 11, 14])
+
+    def test_empates_mantem_a_ordem_atual(self):
+        self.assertEqual(sort_rows(self.typed, 'Status').tolist(), [12, 14, 10, 11, 13])
+        # Ordenar por data e depois por status equivale a ordenar pelos dois
+        by_date = self.typed.loc[sort_rows(self.typed, 'Carimbo de data/hora')]
+        self.assertEqual(sort_rows(by_date, 'Status').tolist(), [14, 12, 11, 10, 13])
+
+    def test_coluna_inexistente_mantem_a_ordem(self):
+        self.assertEqual(sort_rows(self.typed, 'Orientador').tolist(), [10, 11, 12, 13, 14])
+
+
+if __name__ == '__main__':
+    unittest.main()
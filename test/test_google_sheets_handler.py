@@ -0,0 +1,220 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import gspread
+import requests
+from gspread.utils import a1_to_rowcol
+
+import logger_app
+from google_sheets_handler import GoogleSheetsHandler
+from retry_policy import CircuitBreaker, RetryPolicy, SheetsUnavailableError
+
+HEADER = ['Carimbo de data/hora', 'Id', 'Status', 'Ultima Atualizacao', 'Valor', 'CPF:',
+          'Nome completo (sem abreviações):', 'Endereço completo (logradouro, número, bairro, cidade e estado)']
+ADDRESS = HEADER[-1]
+
+
+def make_row(i, valor='10', status=''):
+    return [f'{10 + i:02d}/01/2025 10:00:00', f'2025-{i + 1:04d}', status, '', valor,
+            f'012.345.678-{i:02d}', f'Pessoa {i}', f'Rua {i}']
+
+
+class FakeSheet:
+    """Planilha em memória com as chamadas do gspread usadas pelo handler."""
+
+    def __init__(self, rows):
+        self.rows = [list(HEADER)] + [list(row) for row in rows]
+
+    def row_values(self, row_number):
+        return list(self.rows[row_number - 1])
+
+    def cell(self, row_number, col_number):
+        row = self.rows[row_number - 1] if row_number <= len(self.rows) else []
+        return mock.Mock(value=row[col_number - 1] if col_number <= len(row) else '')
+
+    def _bounds(self, a1):
+        start, _, end = a1.partition(':')
+        first_row, first_col = self._cell(start, 1)
+        last_row, last_col = self._cell(end or start, len(self.rows))
+        return first_row, first_col, last_row, last_col
+
+    @staticmethod
+    def _cell(a1, default_row):
+        letters = ''.join(ch for ch in a1 if ch.isalpha())
+        digits = ''.join(ch for ch in a1 if ch.isdigit())
+        return int(digits) if digits else default_row, a1_to_rowcol(letters + '1')[1]
+
+    def batch_get(self, ranges, major_dimension=None):
+        result = []
+        for a1 in ranges:
+            first_row, first_col, last_row, last_col = self._bounds(a1)
+            values = [
+                [row[col - 1] if col <= len(row) else '' for col in range(first_col, last_col + 1)]
+                for row in self.rows[first_row - 1:last_row]
+            ]
+            if major_dimension == 'COLUMNS':
+                values = [list(column) for column in zip(*values)]
+            # Como a API, omite as células vazias do fim
+            for value_list in values:
+                while value_list and value_list[-1] == '':
+                    value_list.pop()
+            result.append(values)
+        return result
+
+    def batch_update(self, data, raw=False):
+        for update in data:
+            row_number, col_number = a1_to_rowcol(update['range'])
+            self.rows[row_number - 1][col_number - 1] = update['values'][0][0]
+
+
+def make_handler(rows, **kwargs):
+    """Handler ligado a uma ``FakeSheet``; nada acessa a rede nem a cota."""
+    sheet = FakeSheet(rows)
+    snapshot_path = os.path.join(tempfile.mkdtemp(), 'snapshot.sqlite')
+    with mock.patch('sheets_client.get_client'), \
+            mock.patch('sheets_client.open_spreadsheet', return_value=mock.MagicMock(sheet1=sheet)), \
+            mock.patch('sheets_client.get_worksheet'):
+        kwargs.setdefault('write_behind', False)
+        handler = GoogleSheetsHandler('credentials.json', 'url', snapshot_path=snapshot_path, **kwargs)
+    handler.retry_policy.quota_caller = None
+    return handler, sheet
+
+
+class HandlerTestCase(unittest.TestCase):
+    def setUp(self):
+        for name in ('log_error', 'log_warning', 'log_info', 'log_data_change'):
+            patcher = mock.patch.object(logger_app, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class TestLoadTypedData(HandlerTestCase):
+    def test_valores_em_reais_chegam_como_texto_a_conversao(self):
+        handler, _ = make_handler([make_row(0, '12,50'), make_row(1, '1.500'), make_row(2, '1.234,56'),
+                                   make_row(3, 'R$ 10,00'), make_row(4, '')])
+        typed = handler.load_typed_data()
+        self.assertEqual(typed['Valor_cents'].tolist(), [1250, 150000, 123456, 1000, 0])
+        self.assertEqual(typed['CPF:'].iloc[0], '012.345.678-00')
+        self.assertEqual(typed['CPF_norm'].iloc[0], '01234567800')
+
+    def test_linha_lida_sozinha_tambem_mantem_o_texto(self):
+        handler, sheet = make_handler([make_row(0), make_row(1)])
+        handler.load_data()
+        sheet.rows[2][4] = '1.234,56'
+        handler._data_loaded_at -= 1000
+        self.assertEqual(handler.get_row(1)['Valor'], '1.234,56')
+
+
+class TestWriteRowsRetry(HandlerTestCase):
+    def test_conferencia_sem_rede_abre_o_disjuntor(self):
+        handler, sheet = make_handler([make_row(0), make_row(1)])
+        handler.load_data()
+        handler.retry_policy = RetryPolicy(max_attempts=2, base_delay=0.001, max_delay=0.001,
+                                           circuit_breaker=CircuitBreaker(failure_threshold=3))
+        sheet.batch_get = mock.Mock(side_effect=requests.exceptions.ConnectionError('sem rede'))
+        for _ in range(3):
+            with self.assertRaises(SheetsUnavailableError):
+                handler._write_rows([('10/01/2025 10:00:00', {'Status': 'Pago'})])
+        self.assertTrue(handler.api_degraded)
+        self.assertEqual(sheet.batch_get.call_count, 6)
+
+
+class TestDelta(HandlerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.handler, self.sheet = make_handler([make_row(i) for i in range(4)])
+        self.handler.load_data()
+        self.version = self.handler.data_version
+
+    def fetch_delta(self):
+        with mock.patch.object(self.handler, '_fetch_records', wraps=self.handler._fetch_records) as full:
+            self.handler.refresh()
+        return full.call_count == 0
+
+    def test_linhas_novas_no_fim(self):
+        self.sheet.rows += [make_row(4), make_row(5, '1.234,56')]
+        self.assertTrue(self.fetch_delta())
+        self.assertEqual(self.handler.changes_since(self.version), ([4, 5], []))
+        data = self.handler.load_data()
+        self.assertEqual(data['Id'].tolist()[-2:], ['2025-0005', '2025-0006'])
+        self.assertEqual(data.at[5, 'Valor'], '1.234,56')
+
+    def test_linha_com_ultima_atualizacao_nova(self):
+        self.sheet.rows[2][2:4] = ['Pago', '20/01/2025 09:00:00']
+        self.assertTrue(self.fetch_delta())
+        self.assertEqual(self.handler.changes_since(self.version), ([], [1]))
+        self.assertEqual(self.handler.load_data().at[1, 'Status'], 'Pago')
+
+    def test_sem_alteracoes_nao_muda_a_versao(self):
+        self.assertTrue(self.fetch_delta())
+        self.assertEqual(self.handler.data_version, self.version)
+
+    def test_linha_inserida_recarrega_tudo(self):
+        self.sheet.rows.insert(2, make_row(9))
+        self.assertFalse(self.fetch_delta())
+        self.assertIsNone(self.handler.changes_since(self.version))
+        self.assertEqual(self.handler.load_data()['Id'].tolist(),
+                         ['2025-0001', '2025-0010', '2025-0002', '2025-0003', '2025-0004'])
+
+    def test_linha_removida_recarrega_tudo(self):
+        del self.sheet.rows[2]
+        self.assertFalse(self.fetch_delta())
+        self.assertIsNone(self.handler.changes_since(self.version))
+        self.assertEqual(self.handler.load_data()['Id'].tolist(), ['2025-0001', '2025-0003', '2025-0004'])
+
+    def test_alteracao_ainda_nao_gravada_continua_no_cache(self):
+        self.handler.write_behind = True
+        self.handler.flush_interval = 60  # a fila não grava durante o teste
+        self.handler._queue_write('11/01/2025 10:00:00', 3, {'Status': 'Pago'})
+        # Outra pessoa altera a mesma linha na planilha antes da gravação
+        self.sheet.rows[2][3:5] = ['20/01/2025 09:00:00', '99']
+        self.assertTrue(self.fetch_delta())
+        data = self.handler.load_data()
+        self.assertEqual((data.at[1, 'Status'], data.at[1, 'Valor']), ('Pago', '99'))
+
+
+class TestGetRow(HandlerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.handler, self.sheet = make_handler([make_row(i) for i in range(3)])
+        self.handler.load_data()
+
+    def test_linha_do_cache_com_textos_longos(self):
+        row = self.handler.get_row(1)
+        self.assertEqual((row['Id'], row[ADDRESS]), ('2025-0002', 'Rua 1'))
+        # Segunda abertura sai do cache, sem ler a planilha
+        with mock.patch.object(self.sheet, 'batch_get') as batch_get:
+            self.assertEqual(self.handler.get_row(1)[ADDRESS], 'Rua 1')
+        batch_get.assert_not_called()
+
+    def test_encontra_a_linha_depois_de_insercao(self):
+        self.sheet.rows.insert(1, make_row(9))
+        self.handler._data_loaded_at -= 1000
+        row = self.handler.get_row(1)
+        self.assertEqual((row['Id'], row[ADDRESS]), ('2025-0002', 'Rua 1'))
+        self.assertEqual(row.name, 2)
+
+    def test_api_indisponivel_usa_a_linha_do_cache(self):
+        self.handler._data_loaded_at -= 1000
+        with mock.patch.object(self.handler, '_fetch_ranges', side_effect=SheetsUnavailableError('sem rede')):
+            row = self.handler.get_row(2)
+            self.assertEqual((row['Id'], row[ADDRESS]), ('2025-0003', ''))
+            self.assertIsNone(self.handler.get_row(99))
+
+        self.handler.get_row(2)  # lê os textos longos
+        self.handler._data_loaded_at -= 1000
+        with mock.patch.object(self.handler, '_fetch_ranges', side_effect=SheetsUnavailableError('sem rede')):
+            self.assertEqual(self.handler.get_row(2)[ADDRESS], 'Rua 2')
+
+    def test_detalhes_sem_api_voltam_sem_textos_longos(self):
+        response = mock.Mock(status_code=403)
+        response.json.return_value = {'error': {'code': 403, 'message': 'The caller does not have permission'}}
+        row = self.handler.load_data().loc[0]
+        with mock.patch.object(self.handler, '_fetch_ranges', side_effect=gspread.exceptions.APIError(response)):
+            self.assertIs(self.handler.load_row_details(row), row)
+
+
+if __name__ == '__main__':
+    unittest.main()
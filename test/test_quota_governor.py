@@ -0,0 +1,77 @@
+import threading
+import time
+import unittest
+
+import quota_governor
+from quota_governor import BACKGROUND, INTERACTIVE, LOW, QuotaGovernor
+
+
+class TestQuotaGovernor(unittest.TestCase):
+    def drained(self, requests_per_minute):
+        governor = QuotaGovernor(requests_per_minute=requests_per_minute, burst=5)
+        for _ in range(5):
+            self.assertTrue(governor.acquire('teste', priority=INTERACTIVE, timeout=0))
+        return governor
+
+    def test_interativa_passa_na_frente(self):
+        governor = self.drained(requests_per_minute=600)  # 10 fichas por segundo
+        order = []
+
+        def take(priority):
+            governor.acquire('teste', priority=priority, timeout=5)
+            order.append(priority)
+
+        threads = [threading.Thread(target=take, args=(priority,)) for priority in (LOW, BACKGROUND)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.02)
+        # Chega por último, mas é atendida primeiro
+        threads.append(threading.Thread(target=take, args=(INTERACTIVE,)))
+        threads[-1].start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, [INTERACTIVE, BACKGROUND, LOW])
+
+    def test_reserva_por_prioridade(self):
+        governor = QuotaGovernor(requests_per_minute=6, burst=5)
+        for _ in range(2):
+            governor.acquire('teste', priority=INTERACTIVE, timeout=0)
+        # Restam 3 fichas: LOW deixa 4 de reserva, BACKGROUND deixa 2
+        self.assertFalse(governor.acquire('logger', priority=LOW, timeout=0))
+        self.assertTrue(governor.acquire('poller', priority=BACKGROUND, timeout=0))
+        self.assertFalse(governor.acquire('poller', priority=BACKGROUND, timeout=0))
+        self.assertTrue(governor.acquire('interface', priority=INTERACTIVE, timeout=0))
+
+    def test_baixa_prioridade_desiste_no_prazo(self):
+        governor = self.drained(requests_per_minute=6)
+        start = time.monotonic()
+        self.assertFalse(governor.acquire('logger', priority=LOW, timeout=0.2))
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_chamadas_por_minuto(self):
+        governor = QuotaGovernor(requests_per_minute=60, burst=10)
+        for caller in ('sheets_handler', 'sheets_handler', 'logger'):
+            governor.acquire(caller, priority=INTERACTIVE)
+        self.assertEqual(governor.calls_per_minute(), {'sheets_handler': 2, 'logger': 1})
+
+
+class TestCurrentPriority(unittest.TestCase):
+    def test_thread_da_interface_e_demais(self):
+        self.assertEqual(quota_governor.current_priority(), INTERACTIVE)
+        found = []
+
+        def worker():
+            found.append(quota_governor.current_priority())
+            with quota_governor.priority(INTERACTIVE):
+                found.append(quota_governor.current_priority())
+            found.append(quota_governor.current_priority())
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(found, [BACKGROUND, INTERACTIVE, BACKGROUND])
+
+
+if __name__ == '__main__':
+    unittest.main()
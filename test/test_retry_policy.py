@@ -0,0 +1,98 @@
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import logger_app
+from retry_policy import CircuitBreaker, RetryPolicy, SheetsUnavailableError
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        for name in ('log_error', 'log_warning', 'log_info'):
+            patcher = mock.patch.object(logger_app, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_desiste_no_prazo(self):
+        policy = RetryPolicy(max_attempts=50, base_delay=0.05, max_delay=0.05, deadline=0.3)
+        func = mock.Mock(side_effect=requests.exceptions.ConnectionError('sem rede'), __name__='func')
+        start = time.monotonic()
+        with self.assertRaises(SheetsUnavailableError):
+            policy.call(func)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertLess(func.call_count, 50)
+
+    def test_erro_permanente_nao_e_repetido(self):
+        policy = RetryPolicy(base_delay=0.01)
+        func = mock.Mock(side_effect=ValueError('requisição inválida'), __name__='func')
+        with self.assertRaises(ValueError):
+            policy.call(func)
+        self.assertEqual(func.call_count, 1)
+        self.assertFalse(policy.circuit_breaker.is_open)
+
+    def test_repete_erro_transitorio(self):
+        policy = RetryPolicy(base_delay=0.01, max_delay=0.01)
+        func = mock.Mock(side_effect=[requests.exceptions.Timeout('lento'), 'ok'], __name__='func')
+        self.assertEqual(policy.call(func), 'ok')
+        self.assertEqual(func.call_count, 2)
+
+    def test_falha_de_chamada_interna_conta_no_disjuntor(self):
+        policy = RetryPolicy(max_attempts=2, base_delay=0.001, max_delay=0.001,
+                             circuit_breaker=CircuitBreaker(failure_threshold=2))
+        inner = mock.Mock(side_effect=requests.exceptions.ConnectionError('sem rede'), __name__='inner')
+        outer = mock.Mock(side_effect=lambda: policy.call(inner), __name__='outer')
+        for _ in range(2):
+            with self.assertRaises(SheetsUnavailableError):
+                policy.call(outer)
+        self.assertTrue(policy.circuit_breaker.is_open)
+        # A chamada externa não repete a interna, que já fez as próprias tentativas
+        self.assertEqual(outer.call_count, 2)
+        self.assertEqual(inner.call_count, 4)
+
+    def test_jitter_fica_no_limite_exponencial(self):
+        policy = RetryPolicy(base_delay=0.5, max_delay=8.0)
+        for attempt, limit in [(0, 0.5), (2, 2.0), (10, 8.0)]:
+            delays = [policy.backoff(attempt) for _ in range(200)]
+            self.assertTrue(all(0 <= delay <= limit for delay in delays))
+            self.assertGreater(len(set(delays)), 1)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        for name in ('log_warning', 'log_info'):
+            patcher = mock.patch.object(logger_app, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+
+    def test_abre_apos_falhas_seguidas(self):
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.is_open)
+        self.assertFalse(self.breaker.allow())
+
+    def test_meio_aberto_libera_uma_chamada_de_teste(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        time.sleep(0.15)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())  # só um teste por vez
+        self.breaker.record_success()
+        self.assertFalse(self.breaker.is_open)
+        self.assertTrue(self.breaker.allow())
+
+    def test_teste_com_falha_reabre(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        time.sleep(0.15)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.is_open)
+        self.assertFalse(self.breaker.allow())
+
+
+if __name__ == '__main__':
+    unittest.main()
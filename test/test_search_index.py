@@ -0,0 +1,156 @@
+import random
+import time
+import unittest
+
+import pandas as pd
+
+from search_index import ROW_CHECK_LIMIT, SearchIndex, TrigramIndex, parse_query, refines
+
+ROWS = pd.DataFrame({
+    'Nome completo (sem abreviações):': ['João Silva', 'Maria Souza', 'José Pereira', 'Mariana Geo'],
+    'Curso:': ['Geologia', 'Geografia', 'Geologia', 'Ensino'],
+    'Orientador': ['Prof. Souza', 'Prof. Silva', 'Prof. Souza', 'Prof. Lima'],
+    'Telefone de contato:': ['(19) 99876-5432', '19 3333-4444', '', ''],
+    'CPF:': ['123.456.789-00', '', '', ''],
+    'Status': ['', 'Pago', 'Solicitação Aceita', ''],
+}, index=[10, 11, 12, 13])
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.add_rows(ROWS)
+
+    def test_prefixo_de_palavra_sem_acentos(self):
+        self.assertEqual(self.index.search('joao'), {10})
+        self.assertEqual(self.index.search('JOSÉ'), {12})
+        self.assertEqual(self.index.search('geo'), {10, 11, 12, 13})
+        self.assertEqual(self.index.search('ologia'), set())
+
+    def test_todos_os_termos(self):
+        self.assertEqual(self.index.search('mar geo'), {11, 13})
+        self.assertEqual(self.index.search('maria souza'), {11})
+
+    def test_campo_termo(self):
+        self.assertEqual(parse_query('curso:geo silva'), [('Curso:', 'geo'), (None, 'silva')])
+        self.assertEqual(self.index.search('curso:geologia'), {10, 12})
+        self.assertEqual(self.index.search('orientador:silva'), {11})
+        self.assertEqual(self.index.search('nome:souza'), {11})
+        # Campo desconhecido vira texto comum: 'prof' e 'souza' em qualquer coluna
+        self.assertEqual(self.index.search('prof:souza'), {10, 11, 12})
+
+    def test_trechos_de_cpf_e_telefone(self):
+        self.assertEqual(self.index.search('9876'), {10})
+        self.assertEqual(self.index.search('12345678900'), {10})
+        self.assertEqual(self.index.search('123.456.789-00'), {10})
+        self.assertEqual(self.index.search('telefone:33334444'), {11})
+
+    def test_consulta_sem_termos(self):
+        self.assertIsNone(self.index.search(''))
+        self.assertIsNone(self.index.search(' - '))
+
+    def test_reindexa_linha_alterada(self):
+        changed = ROWS.loc[[10]].copy()
+        changed['Nome completo (sem abreviações):'] = 'Zélia Prado'
+        self.index.add_rows(changed)
+        self.assertEqual(self.index.search('zelia'), {10})
+        self.assertEqual(self.index.search('joao'), set())
+        self.index.remove(10)
+        self.assertEqual(self.index.search('zelia'), set())
+        self.assertEqual(len(self.index), 3)
+
+
+def random_rows(n, seed):
+    rnd = random.Random(seed)
+    first = ['Maria', 'Mário', 'Marcos', 'João', 'José', 'Ana', 'Anderson', 'Paula']
+    return pd.DataFrame({
+        'Nome completo (sem abreviações):': [f'{rnd.choice(first)} Nome{rnd.randrange(300)} Silva' for _ in range(n)],
+        'Curso:': [rnd.choice(['Geologia', 'Geografia', 'Ensino']) for _ in range(n)],
+        'Orientador': [rnd.choice(['Mariana Souza', 'Paulo Geo', 'Ana Lima']) for _ in range(n)],
+        'Telefone de contato:': [f'(19) 9{rnd.randrange(10 ** 8):08d}' for _ in range(n)],
+    })
+
+
+class TestNarrowing(unittest.TestCase):
+    def test_refines(self):
+        self.assertTrue(refines(parse_query('maria'), parse_query('mar')))
+        self.assertTrue(refines(parse_query('maria geo'), parse_query('maria')))
+        self.assertTrue(refines(parse_query('nome:maria'), parse_query('mar')))
+        self.assertFalse(refines(parse_query('mar'), parse_query('maria')))
+        self.assertFalse(refines(parse_query('maria'), parse_query('nome:mar')))
+        self.assertFalse(refines(parse_query('paula'), parse_query('maria')))
+
+    def test_estreitar_da_o_mesmo_resultado_que_buscar_do_zero(self):
+        # Mais linhas que ROW_CHECK_LIMIT, para passar pelos dois modos de filtrar o resultado anterior
+        rows = random_rows(ROW_CHECK_LIMIT * 3, seed=1)
+        typed_index, fresh_index = SearchIndex(), SearchIndex()
+        typed_index.add_rows(rows)
+        fresh_index.add_rows(rows)
+        rnd = random.Random(2)
+        words = ['maria', 'mario', 'marcos', 'nome12', 'silva', 'geo', 'geografia', 'curso:geo',
+                 'orientador:paulo', 'nome:ana', '9876', '199', 'xyz']
+        for _ in range(40):
+            # Simula a digitação: cada consulta estende a anterior letra a letra ou com um termo novo
+            query = ''
+            for word in rnd.sample(words, 3):
+                for end in range(1, len(word) + 1):
+                    current = (query + ' ' + word[:end]).strip()
+                    fresh_index._last = None
+                    self.assertEqual(typed_index.search(current), fresh_index.search(current), current)
+                query = (query + ' ' + word).strip()
+
+
+FIRST_NAMES = ['Maria', 'Ana', 'João', 'José', 'Pedro', 'Paulo', 'Lucas', 'Beatriz', 'Carla', 'Fernanda',
+               'Gabriel', 'Rafael', 'Juliana', 'Mariana', 'Bruno', 'Camila', 'Felipe', 'Larissa', 'Thiago',
+               'Amanda', 'Rodrigo', 'Patrícia', 'Marcos', 'Letícia', 'Gustavo', 'Vanessa', 'Diego', 'Aline']
+LAST_NAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima',
+              'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes',
+              'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques']
+
+
+class TestTrigramIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # 50 mil linhas com cerca de 100 mil nomes distintos entre solicitantes e orientadores
+        rnd = random.Random(0)
+
+        def name():
+            return ' '.join([rnd.choice(FIRST_NAMES), rnd.choice(FIRST_NAMES),
+                             rnd.choice(LAST_NAMES), rnd.choice(LAST_NAMES)])
+
+        rows = 50000
+        cls.index = TrigramIndex()
+        cls.index.add_rows(pd.DataFrame({
+            'Nome completo (sem abreviações):': [name() for _ in range(rows)],
+            'Orientador': [name() for _ in range(rows)],
+        }))
+
+    def test_nomes_com_erros_de_digitacao(self):
+        small = TrigramIndex()
+        small.add_rows(ROWS)
+        self.assertEqual(small.lookup('Joao Sliva', limit=1)[0][0], 'João Silva')
+        self.assertEqual(small.lookup('Marianna', limit=1)[0][3], {13})
+        self.assertEqual([name for name, *_ in small.lookup('souza', columns=['Orientador'])], ['Prof. Souza'])
+        self.assertEqual(small.lookup('xyz'), [])
+
+    def test_melhores_nomes_entre_muitos(self):
+        for query, expected in [('Mria Santoz', 'santos'), ('Beatriz Nascimentoxyz', 'nascimento'),
+                                ('Fernanda Oliveira Costa', 'oliveira')]:
+            found = self.index.lookup(query, limit=5)
+            self.assertEqual(len(found), 5)
+            similarities = [similarity for _, _, similarity, _ in found]
+            self.assertEqual(similarities, sorted(similarities, reverse=True))
+            self.assertTrue(all(expected in name.lower() for name, *_ in found), found)
+
+    def test_consulta_em_menos_de_50_ms(self):
+        for query in ['Mria Santoz', 'Beatriz Nascimentoxyz', 'Fernanda Oliveira Costa', 'maria']:
+            elapsed = []
+            for _ in range(3):
+                start = time.perf_counter()
+                self.index.lookup(query)
+                elapsed.append(time.perf_counter() - start)
+            self.assertLess(min(elapsed), 0.05, query)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import logger_app
+from sqlite_backend import SQLiteBackend
+
+
+def make_rows(n):
+    return pd.DataFrame({
+        'Carimbo de data/hora': [f'{10 + i:02d}/01/2025 10:00:00' for i in range(n)],
+        'Id': [f'2025-{i + 1:04d}' for i in range(n)],
+        'Status': [''] * n,
+        'Valor': ['10'] * n,
+        'Ultima Atualizacao': [''] * n,
+    })
+
+
+class BackendTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(logger_app, 'log_data_change')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.path = os.path.join(tempfile.mkdtemp(), 'requests.sqlite')
+        self.backend = SQLiteBackend(self.path)
+        self.backend.import_dataframe(make_rows(6))
+        self.backend.load_data()
+
+
+class TestChangesSince(BackendTestCase):
+    def test_alteracoes_incrementais(self):
+        version = self.backend.data_version
+        self.backend.update_status('11/01/2025 10:00:00', 'Pago')
+        self.backend.update_status('13/01/2025 10:00:00', 'Pago')
+        self.assertEqual(self.backend.changes_since(version), ([], [1, 3]))
+        self.assertEqual(self.backend.changes_since(self.backend.data_version), ([], []))
+
+    def test_recarga_completa_exige_recarregar_tudo(self):
+        version = self.backend.data_version
+        self.backend.update_status('11/01/2025 10:00:00', 'Pago')
+        self.backend.import_dataframe(make_rows(7))
+        self.backend.load_data()
+        self.assertIsNone(self.backend.changes_since(version))
+
+    def test_historico_insuficiente(self):
+        version = self.backend.data_version
+        for n in range(self.backend._change_log.maxlen + 1):
+            self.backend.update_value('11/01/2025 10:00:00', str(n))
+        self.assertIsNone(self.backend.changes_since(version))
+        self.assertEqual(self.backend.changes_since(self.backend.data_version - 1), ([], [1]))
+
+
+class TestStatusIndex(BackendTestCase):
+    def test_ordem_padrao_por_id_decrescente(self):
+        self.assertEqual(self.backend.status_index(), [5, 4, 3, 2, 1, 0])
+        self.assertEqual(self.backend.status_index(''), [5, 4, 3, 2, 1, 0])
+        self.assertEqual(self.backend.status_index('Pago'), [])
+
+    def test_linha_muda_de_status(self):
+        self.backend.status_index()
+        self.backend.update_status('12/01/2025 10:00:00', 'Pago')
+        self.backend.update_status('14/01/2025 10:00:00', 'Pago')
+        self.assertEqual(self.backend.status_index(''), [5, 3, 1, 0])
+        self.assertEqual(self.backend.status_index('Pago'), [4, 2])
+        self.assertEqual(self.backend.status_index(), [5, 4, 3, 2, 1, 0])
+        self.assertEqual(self.backend.status_counts(), {'': 4, 'Pago': 2})
+
+        # A mesma linha volta ao status anterior sem deixar cópia na lista antiga
+        self.backend.update_status('12/01/2025 10:00:00', '')
+        self.assertEqual(self.backend.status_index(''), [5, 3, 2, 1, 0])
+        self.assertEqual(self.backend.status_index('Pago'), [4])
+
+    def test_indice_incremental_igual_ao_reconstruido(self):
+        self.backend.status_index()
+        for timestamp, status in [('10/01/2025 10:00:00', 'Pago'), ('13/01/2025 10:00:00', 'Cancelado'),
+                                  ('10/01/2025 10:00:00', 'Solicitação Aceita')]:
+            self.backend.update_status(timestamp, status)
+        rebuilt = SQLiteBackend(self.path)
+        for status in (None, '', 'Pago', 'Cancelado', 'Solicitação Aceita'):
+            self.assertEqual(self.backend.status_index(status), rebuilt.status_index(status))
+
+
+if __name__ == '__main__':
+    unittest.main()
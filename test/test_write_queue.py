@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import gspread
+import requests
+
+import logger_app
+from google_sheets_handler import GoogleSheetsHandler
+
+HEADER = ['Carimbo de data/hora', 'Id', 'Status', 'Valor']
+
+
+def make_handler(**kwargs):
+    """Handler com a planilha simulada; nada acessa a rede."""
+    sheet = mock.MagicMock()
+    sheet.row_values.return_value = HEADER
+    snapshot_path = os.path.join(tempfile.mkdtemp(), 'snapshot.sqlite')
+    with mock.patch('sheets_client.get_client'), \
+            mock.patch('sheets_client.open_spreadsheet', return_value=mock.MagicMock(sheet1=sheet)), \
+            mock.patch('sheets_client.get_worksheet'):
+        return GoogleSheetsHandler('credentials.json', 'url', snapshot_path=snapshot_path, **kwargs)
+
+
+class TestWriteQueue(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(logger_app, 'log_error')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.handler = make_handler()
+
+    def test_alteracoes_da_mesma_celula_sao_agrupadas(self):
+        self.handler.flush_interval = 0.3
+        with mock.patch.object(self.handler, '_write_rows') as write_rows:
+            self.handler._queue_write('t1', 2, {'Status': 'A'})
+            self.handler._queue_write('t1', 2, {'Status': 'B', 'Valor': 10})
+            self.handler._queue_write('t2', 3, {'Status': 'C'})
+            self.assertEqual(self.handler.pending_writes, 3)
+            self.assertTrue(self.handler.flush(timeout=5))
+
+        write_rows.assert_called_once_with([('t1', {'Status': 'B', 'Valor': 10}), ('t2', {'Status': 'C'})])
+        self.assertEqual(self.handler.pending_writes, 0)
+
+    def test_lote_com_falha_volta_para_a_fila(self):
+        self.handler.flush_interval = 0.02
+        calls = []
+
+        def write_rows(items):
+            calls.append(items)
+            if len(calls) == 1:
+                # Alteração mais nova da mesma célula chega enquanto o lote falha
+                self.handler._queue_write('t1', 2, {'Status': 'B'})
+                raise requests.exceptions.ConnectionError('falha de rede')
+
+        with mock.patch.object(self.handler, '_write_rows', side_effect=write_rows):
+            self.handler._queue_write('t1', 2, {'Status': 'A', 'Valor': 5})
+            self.assertTrue(self.handler.flush(timeout=5))
+
+        self.assertEqual(calls, [
+            [('t1', {'Status': 'A', 'Valor': 5})],
+            [('t1', {'Valor': 5, 'Status': 'B'})],
+        ])
+        self.assertEqual(self.handler.pending_writes, 0)
+
+    def test_lote_com_erro_permanente_e_descartado(self):
+        self.handler.flush_interval = 0.02
+        self.handler._data_loaded_at = 0
+        response = mock.Mock(status_code=400)
+        response.json.return_value = {'error': {'code': 400, 'message': 'Unable to parse range'}}
+        error = gspread.exceptions.APIError(response)
+
+        with mock.patch.object(self.handler, '_write_rows', side_effect=error) as write_rows:
+            self.handler._queue_write('t1', 2, {'Status': 'A'})
+            self.assertTrue(self.handler.flush(timeout=1))
+
+        write_rows.assert_called_once()
+        self.assertEqual(self.handler.pending_writes, 0)
+        # O cache, que já tinha a alteração, será baixado de novo por inteiro
+        self.assertIsNone(self.handler._data_loaded_at)
+        self.assertEqual(self.handler._delta_refreshes, self.handler.full_refresh_every)
+        self.assertIn('descartadas', logger_app.log_error.call_args[0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()